@@ -0,0 +1,219 @@
+"""Timings of construction, elevation, and plotting hot paths
+
+Every case is timed a few times, keeping the fastest run per call.
+Cases scale the height of cabinets, the count of drawers and shelves,
+and the count of cabinets of a project.
+
+Run from the root of the repository::
+
+    python benchmarks/hot_paths.py --save baseline.json
+    python benchmarks/hot_paths.py --compare baseline.json --threshold .2
+
+Comparison exits with status 1 when any case is slower than its
+baseline by more than the threshold. Cases can be selected by a part
+of their name with `--filter`, for example `--filter elevation`.
+
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cabinet_making.cabinet_maker import CabinetMaker  # noqa: E402
+from cabinet_making.constructions import (  # noqa: E402
+    Corpus, Cupboard, FloorCabinet
+)
+from cabinet_making.measurements import CupboardElevation  # noqa: E402
+
+heights = [256, 768, 1280, 2208, 2688]
+drawer_counts = [1, 4, 8]
+shelf_counts = [1, 4, 12]
+project_sizes = [1, 10, 100, 1000]
+plot_heights = [768, 2208]
+repeats = 5
+drawer_front = 160
+shelf_spacing = 160
+
+
+def _floor_cabinet(height: int, drawers: int, width: int = 608):
+
+    return FloorCabinet(
+        height=height,
+        width=width,
+        depth=544,
+        drawers=[drawer_front]*drawers,
+        sections=[height],
+        doors_per_section=[0]
+    )
+
+
+def _cupboard(height: int, shelves: int):
+
+    return Cupboard(
+        height=height,
+        width=608,
+        depth=544,
+        back_tolerance=6,
+        shelves=shelves,
+        front_sections=[height],
+        doors_per_section=[1]
+    )
+
+
+def _elevation(height: int, drawers: int = 0, shelves: int = 0):
+
+    return CupboardElevation(
+        height=height,
+        sections=[height],
+        drawers=[drawer_front]*drawers,
+        shelves=[shelf_spacing*(shelf + 1) for shelf in range(shelves)]
+    )
+
+
+def _computed_elevation(height: int, **kwargs):
+    elevation = _elevation(height, **kwargs)
+    elevation.compute_elevation()
+
+    return elevation
+
+
+def _project(cabinets: int):
+    # Widths vary as within a kitchen.
+    widths = [448, 512, 608, 800]
+    for index in range(cabinets):
+        _floor_cabinet(768, 4, widths[index % 4]).compute_total_material()
+        _computed_elevation(768, drawers=4)
+
+
+def _plot(height: int, plot_file: str):
+    cabinet_maker = CabinetMaker(
+        cabinet_type='floor',
+        cabinet_name='benchmark',
+        height=height,
+        depth=544,
+        width=608,
+        drawer_front=[drawer_front]*4,
+        sections=[height],
+        doors_per_section=[0]
+    )
+    cabinet_maker.make_cabinet(plot=False, write_elevation=False)
+    cabinet_maker.get_plotter().plot_cabinet(
+        compute_only=True, plot_file=plot_file
+    )
+
+
+def make_cases(plot_dir: str) -> dict:
+    cases = {}
+    for height in heights:
+        cases[f'corpus_material[height={height}]'] = \
+            lambda height=height: Corpus(
+                height=height, width=608, depth=544, back_tolerance=2
+            ).compute_corpus_material()
+        cases[f'floor_material[height={height}]'] = \
+            lambda height=height: \
+            _floor_cabinet(height, 1).compute_total_material()
+        cases[f'cupboard_material[height={height}]'] = \
+            lambda height=height: _cupboard(height, 1).compute_total_material()
+        cases[f'elevation[height={height}]'] = \
+            lambda height=height: _elevation(height).compute_elevation()
+        elevation = _computed_elevation(height)
+        cases[f'system_holes[height={height}]'] = elevation.get_system_holes
+    for drawers in drawer_counts:
+        cases[f'floor_material[drawers={drawers}]'] = \
+            lambda drawers=drawers: \
+            _floor_cabinet(2208, drawers).compute_total_material()
+        cases[f'elevation[drawers={drawers}]'] = \
+            lambda drawers=drawers: \
+            _elevation(2208, drawers=drawers).compute_elevation()
+    for shelves in shelf_counts:
+        cases[f'cupboard_material[shelves={shelves}]'] = \
+            lambda shelves=shelves: \
+            _cupboard(2208, shelves).compute_total_material()
+        cases[f'elevation[shelves={shelves}]'] = \
+            lambda shelves=shelves: \
+            _elevation(2208, shelves=shelves).compute_elevation()
+        elevation = _computed_elevation(2208, shelves=shelves)
+        cases[f'system_holes[shelves={shelves}]'] = elevation.get_system_holes
+    for cabinets in project_sizes:
+        cases[f'project[cabinets={cabinets}]'] = \
+            lambda cabinets=cabinets: _project(cabinets)
+    for height in plot_heights:
+        plot_file = str(Path(plot_dir) / f'benchmark_{height}.pdf')
+        cases[f'plot_cabinet[height={height}]'] = \
+            lambda height=height, plot_file=plot_file: \
+            _plot(height, plot_file)
+
+    return cases
+
+
+def measure(case) -> float:
+    timer = timeit.Timer(case)
+    number, _ = timer.autorange()
+
+    return min(timer.repeat(repeat=repeats, number=number)) / number
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    regressed = False
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f'{name:<40} {seconds*1e3:10.3f} ms  new')
+            continue
+        ratio = seconds / baseline[name]
+        regression = ratio > 1 + threshold
+        regressed = regressed or regression
+        print(
+            f'{name:<40} {seconds*1e3:10.3f} ms  '
+            f'{baseline[name]*1e3:10.3f} ms  {ratio:6.2f}x'
+            + ('  REGRESSION' if regression else '')
+        )
+
+    return regressed
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--filter', default='', help='Part of case names.')
+    parser.add_argument('--save', help='Baseline file to write.')
+    parser.add_argument('--compare', help='Baseline file to compare with.')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=.2,
+        help='Allowed slowdown relative to the baseline, by default 0.2.'
+    )
+    arguments = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as plot_dir:
+        cases = {
+            name: case for name, case in make_cases(plot_dir).items()
+            if arguments.filter in name
+        }
+        results = {}
+        for name, case in cases.items():
+            results[name] = measure(case)
+            if not arguments.compare:
+                print(f'{name:<40} {results[name]*1e3:10.3f} ms')
+    if arguments.save:
+        with open(arguments.save, 'w') as file:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'processor': platform.processor(),
+                'results': results
+            }, file, indent=4)
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)['results']
+
+        return int(compare(results, baseline, arguments.threshold))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
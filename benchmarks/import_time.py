@@ -0,0 +1,80 @@
+"""Import time of modules of `cabinet_making`
+
+Every module is imported in a fresh interpreter, a few times, and the
+fastest import is compared to its budget. Modules are also checked not
+to load heavy dependencies, which only plotting, Excel, or tables of
+material need.
+
+Run from the root of the repository::
+
+    python benchmarks/import_time.py
+
+Exits with status 1 when any module is over its budget. The same
+budgets are enforced by `tests/test_import_time.py`.
+
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+repository = Path(__file__).resolve().parent.parent
+repeats = 3
+heavy_modules = ['pandas', 'matplotlib', 'openpyxl']
+
+# Module, budget in seconds, and heavy modules it may load.
+budgets = [
+    ('cabinet_making.parts', .3, []),
+    ('cabinet_making.constructions', .3, []),
+    ('cabinet_making.cut_list', .1, []),
+    ('cabinet_making.nesting', .3, []),
+    ('cabinet_making.cabinet_maker', .3, []),
+    ('cabinet_making.project_maker', .3, []),
+]
+
+measurement = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(','.join(name for name in {heavy} if name in sys.modules))
+"""
+
+
+def measure(module: str) -> tuple[float, list[str]]:
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                measurement.format(module=module, heavy=heavy_modules)
+            ],
+            cwd=repository,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.split('\n')
+        timings.append(float(output[0]))
+    loaded = [name for name in output[1].split(',') if name]
+
+    return min(timings), loaded
+
+
+def main() -> int:
+    failed = False
+    for module, budget, allowed in budgets:
+        seconds, loaded = measure(module)
+        unexpected = [name for name in loaded if name not in allowed]
+        over = seconds > budget or unexpected
+        failed = failed or over
+        print(
+            f'{module:<32} {seconds*1000:7.1f} ms  budget {budget*1000:5.0f} ms'
+            + (f'  loads {", ".join(unexpected)}' if unexpected else '')
+            + ('  FAILED' if over else '')
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
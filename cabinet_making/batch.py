@@ -0,0 +1,441 @@
+import numpy as np
+import pandas as pd
+
+
+class CutListBatch:
+    """Column-wise cut list for a table of cabinet specifications
+
+    Every part dimension, unit count and banding label is computed with
+    NumPy operations over all cabinets at once, instead of constructing
+    one `FloorCabinet`, `WallCabinet` or `Cupboard` object per cabinet.
+    Rows and their order per cabinet are identical to the output of the
+    `compute_total_material` method of the corresponding class, when the
+    class is constructed directly with the same arguments. They differ
+    from cupboards made by `CabinetMaker`, which passes neither shelves
+    nor drawer faces to `Cupboard`, and always has one door per section.
+
+    Parameters
+    ----------
+    specs : pd.DataFrame
+        One row per cabinet. Mandatory columns are `type` (`floor`,
+        `wall` or `cupboard`), `height`, `width` and `depth`. Optional
+        columns are `drawers` (drawer fronts), `sections`,
+        `doors_per_section`, `shelves` (shelf positions), `dividers`
+        and `back_tolerance`, by default of the type where missing.
+
+    Notes
+    -----
+    For wall cabinets the door count is the first element of
+    `doors_per_section`, and one door if omitted. For cupboards,
+    `drawers` holds the drawer face heights.
+
+    """
+
+    material_thickness = 18
+    rail_width = 96
+    back_tolerance = {'floor': 2, 'wall': 2, 'cupboard': 6}
+    list_columns = [
+        'drawers', 'sections', 'doors_per_section', 'shelves', 'dividers'
+    ]
+    # Order of part blocks within a single cabinet.
+    _sides = 0
+    _top = 1
+    _front_stretcher = 2
+    _back_stretcher = 3
+    _back = 4
+    _rails = 5
+    _h_dividers = 6
+    _h_divider_rails = 7
+    _shelves = 8
+    _drawers = 9
+    _drawer_stretcher = 10
+    _doors = 11
+
+    def __init__(self, specs: pd.DataFrame = None) -> None:
+        self.specs = specs
+        self._type = None
+        self._height = None
+        self._width = None
+        self._depth = None
+        self._inner_width = None
+        self._back_tolerance = None
+        self._lists = {}
+        self._blocks = []
+        self._floats = {'x': False, 'y': False}
+
+    def _prepare_specs(self):
+        self._type = self.specs['type'].to_numpy(dtype=object)
+        self._height = self.specs['height'].to_numpy(dtype=np.int64)
+        self._width = self.specs['width'].to_numpy(dtype=np.int64)
+        self._depth = self.specs['depth'].to_numpy(dtype=np.int64)
+        self._inner_width = self._width - (self.material_thickness*2)
+        # Missing tolerances, such as in a frame of mixed types, take the
+        # default of the type.
+        defaults = pd.Series([
+            self.back_tolerance[cabinet_type] for cabinet_type in self._type
+        ], index=self.specs.index)
+        if 'back_tolerance' in self.specs:
+            defaults = self.specs['back_tolerance'].fillna(defaults)
+        self._back_tolerance = defaults.to_numpy(dtype=np.int64)
+        for column in self.list_columns:
+            if column in self.specs:
+                values = [
+                    list(value) if isinstance(value, (list, tuple)) else []
+                    for value in self.specs[column]
+                ]
+            else:
+                values = [[] for _ in range(len(self.specs))]
+            self._lists[column] = values
+
+    def _explode(self, column: str, selection: np.ndarray) -> tuple:
+        """Flatten a list column of the selected cabinets
+
+        Returns
+        -------
+        tuple
+            Cabinet positions, position of the item within its list,
+            and the item values, as flat arrays.
+
+        """
+        cabinets = np.flatnonzero(selection)
+        lists = [self._lists[column][cabinet] for cabinet in cabinets]
+        lengths = np.array([len(items) for items in lists], dtype=np.int64)
+        positions = np.repeat(cabinets, lengths)
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        items = np.arange(lengths.sum()) - starts
+        values = np.fromiter(
+            (value for sub_list in lists for value in sub_list),
+            dtype=np.int64,
+            count=lengths.sum()
+        )
+
+        return positions, items, values
+
+    def _lengths(self, column: str) -> np.ndarray:
+
+        return np.array(
+            [len(items) for items in self._lists[column]], dtype=np.int64
+        )
+
+    def _validate_dimensions(self):
+        assert np.all(self._height % 32 == 0), 'Height not a multiple of 32.'
+        assert np.all(self._width % 32 == 0), 'Width not a multiple of 32.'
+        assert np.all(self._depth % 32 == 0), 'Depth not a multiple of 32.'
+        section_totals = np.array(
+            [sum(sections) for sections in self._lists['sections']]
+        )
+        has_sections = self._lengths('sections') > 0
+        floor = self._type == 'floor'
+        assert np.all(
+            section_totals[floor & has_sections]
+            == self._height[floor & has_sections]
+        )
+        cupboard = self._type == 'cupboard'
+        assert np.all(section_totals[cupboard] == self._height[cupboard]), \
+            'Sections not correct.'
+        assert np.all(
+            self._lengths('sections')[cupboard]
+            == self._lengths('doors_per_section')[cupboard]
+        ), 'Unequal number of doors'
+        _, _, faces = self._explode('drawers', cupboard)
+        assert np.all(faces % 32 == 0), 'Drawer dimension not correct.'
+
+    def _add_block(self,
+                   cabinets: np.ndarray,
+                   block: int,
+                   material: str,
+                   part: str | np.ndarray,
+                   x: np.ndarray,
+                   y: np.ndarray,
+                   units: np.ndarray | int,
+                   banding: str | np.ndarray,
+                   item: np.ndarray = None,
+                   sub: int = 0):
+        count = len(cabinets)
+        if count == 0:
+            return
+        self._floats['x'] |= np.asarray(x).dtype.kind == 'f'
+        self._floats['y'] |= np.asarray(y).dtype.kind == 'f'
+        self._blocks.append({
+            'cabinet': cabinets,
+            'block': np.full(count, block),
+            'item': np.zeros(count, dtype=np.int64) if item is None else item,
+            'sub': np.full(count, sub),
+            'material': np.full(count, material, dtype=object),
+            'part': np.broadcast_to(np.asarray(part, dtype=object), count),
+            'x': np.broadcast_to(x, count).astype(np.float64),
+            'y': np.broadcast_to(y, count).astype(np.float64),
+            'units': np.broadcast_to(units, count).astype(np.int64),
+            'banding': np.broadcast_to(np.asarray(banding, dtype=object), count)
+        })
+
+    @staticmethod
+    def _compare(first: np.ndarray,
+                 second: np.ndarray,
+                 greater: str,
+                 smaller: str,
+                 equal: str) -> np.ndarray:
+        """Banding label from comparison of two dimensions
+
+        """
+        labels = np.full(len(first), equal, dtype=object)
+        labels[first > second] = greater
+        labels[first < second] = smaller
+
+        return labels
+
+    def _corpus(self):
+        cabinets = np.arange(len(self._type))
+        height = self._height
+        width = self._width
+        depth = self._depth
+        inner_width = self._inner_width
+        two_piece = self._type == 'floor'
+        top_bottom_banding = self._compare(
+            inner_width, depth, 'dve duze', 'dve krace', 'N/A'
+        )
+        stretcher_banding = self._compare(
+            inner_width, self.rail_width, 'dve duze', 'dve krace', 'N/A'
+        )
+        self._add_block(
+            cabinets, self._sides, 'Korpus', 'Sides', height, depth, 2,
+            'u krug'
+        )
+        one = ~two_piece
+        self._add_block(
+            cabinets[one], self._top, 'Korpus', 'Top/bottom',
+            inner_width[one], depth[one], 2, top_bottom_banding[one]
+        )
+        self._add_block(
+            cabinets[two_piece], self._top, 'Korpus', 'Bottom',
+            inner_width[two_piece], depth[two_piece], 1,
+            top_bottom_banding[two_piece]
+        )
+        for block in [self._front_stretcher, self._back_stretcher]:
+            self._add_block(
+                cabinets[two_piece], block, 'Korpus',
+                'Top front/back stretcher', inner_width[two_piece],
+                self.rail_width, 1, stretcher_banding[two_piece]
+            )
+        material_remainder = 6
+        self._add_block(
+            cabinets, self._back, 'Lesonit', 'Back',
+            height - (2*material_remainder) - self._back_tolerance,
+            width - (2*material_remainder) - self._back_tolerance,
+            1, 'No edge banding'
+        )
+        self._add_block(
+            cabinets, self._rails, 'Korpus', 'Rails', inner_width,
+            self.rail_width, 2, 'jedna duza'
+        )
+
+    def _drawer_boxes(self, selection: np.ndarray, slide_relief: int,
+                      with_front: bool):
+        """Drawer parts, see `Drawer` for the individual dimensions
+
+        """
+        back_relief = 50
+        back_tolerance = 2
+        cabinets, items, faces = self._explode('drawers', selection)
+        faces = faces.astype(np.int64)
+        width = self._width[cabinets]
+        depth = self._depth[cabinets]
+        front_height = faces - 3
+        front_width = width - 3
+        box_height = front_height + 3 - (24*2)
+        box_width = width - 36 - slide_relief
+        box_inner_width = box_width - 36
+        box_depth = depth - back_relief
+        bottom_width = box_width - (2*12) - back_tolerance
+        bottom_depth = box_depth - (2*12) - back_tolerance
+        side_banding = self._compare(
+            box_inner_width, box_height,
+            'dve duze, jedna kraca', 'dve krace, jedna duza', None
+        )
+        face_back_banding = self._compare(
+            box_depth, box_height, 'dve duze', 'dve krace', None
+        )
+        parts = [
+            ('Korpus', 'Drawer, box (side)', box_depth, box_height,
+             2, side_banding),
+            ('Korpus', 'Drawer, box (face/back)', box_inner_width, box_height,
+             2, face_back_banding),
+        ]
+        if with_front:
+            parts.append(
+                ('Front', 'Drawer, front', front_width, front_height,
+                 1, 'u krug')
+            )
+        parts.append(
+            ('Lesonit', 'Drawer, box (bottom)', bottom_width, bottom_depth,
+             1, 'No banding')
+        )
+        for sub, (material, part, x, y, units, banding) in enumerate(parts):
+            self._add_block(
+                cabinets, self._drawers, material, part, x, y, units,
+                banding, item=items, sub=sub
+            )
+
+    def _floor(self):
+        floor = self._type == 'floor'
+        drawer_count = self._lengths('drawers')
+        self._drawer_boxes(floor, slide_relief=26, with_front=True)
+        stretchers = floor & (drawer_count > 2)
+        cabinets = np.flatnonzero(stretchers)
+        inner_width = self._inner_width[cabinets]
+        banding = np.where(inner_width > 96, 'dve duza', 'dve krace')
+        self._add_block(
+            cabinets, self._drawer_stretcher, 'Korpus', 'Drawer stretcher',
+            inner_width, self.rail_width, drawer_count[cabinets] - 1,
+            banding.astype(object)
+        )
+        selection = floor & (self._lengths('doors_per_section') > 0)
+        assert np.all(
+            self._lengths('sections')[selection]
+            == self._lengths('doors_per_section')[selection]
+        ), 'Unequal number of doors'
+        cabinets, items, sections = self._explode('sections', selection)
+        _, _, doors = self._explode('doors_per_section', selection)
+        # Doors are listed only for sections with at least one door.
+        with_doors = doors >= 1
+        cabinets = cabinets[with_doors]
+        items = items[with_doors]
+        sections = sections[with_doors].astype(np.int64)
+        doors = doors[with_doors].astype(np.int64)
+        part = np.array(
+            [f'Section {section}, door' for section in sections],
+            dtype=object
+        )
+        self._add_block(
+            cabinets, self._doors, 'Front', part,
+            (self._width[cabinets]/doors) - 3, sections - 3, doors,
+            'u krug', item=items
+        )
+
+    def _wall(self):
+        wall = self._type == 'wall'
+        cabinets = np.flatnonzero(wall)
+        shelf_count = self._lengths('shelves')[cabinets]
+        with_shelves = cabinets[shelf_count > 0]
+        shelf_depth = self._depth[with_shelves] - 6 - 6
+        inner_width = self._inner_width[with_shelves]
+        banding = np.where(
+            inner_width > shelf_depth, 'jedna duza', 'jedna kraca'
+        )
+        self._add_block(
+            with_shelves, self._shelves, 'Korpus', 'Shelves', inner_width,
+            shelf_depth, shelf_count[shelf_count > 0], banding.astype(object)
+        )
+        doors = np.array([
+            self._lists['doors_per_section'][cabinet][0]
+            if self._lists['doors_per_section'][cabinet] else 1
+            for cabinet in cabinets
+        ], dtype=np.int64)
+        self._add_block(
+            cabinets, self._doors, 'Front', 'Door', self._height[cabinets],
+            (self._width[cabinets]/doors) - 3, doors, 'u krug'
+        )
+
+    def _cupboard(self):
+        cupboard = self._type == 'cupboard'
+        cabinets = np.flatnonzero(cupboard)
+        depth = self._depth[cabinets]
+        inner_width = self._inner_width[cabinets]
+        h_divider_depth = depth - 6
+        shelf_depth = depth - 6 - 6
+        h_dividers_banding = self._compare(
+            inner_width, h_divider_depth, 'jedna duza', 'jedna kraca', 'N/A'
+        )
+        shelf_banding = self._compare(
+            inner_width, shelf_depth, 'jedna duza', 'jedna kraca', 'N/A'
+        )
+        h_dividers = self._lengths('dividers')[cabinets]
+        selection = h_dividers > 0
+        self._add_block(
+            cabinets[selection], self._h_dividers, 'Korpus',
+            'Horizontal Dividers', inner_width[selection],
+            h_divider_depth[selection], h_dividers[selection],
+            h_dividers_banding[selection]
+        )
+        self._add_block(
+            cabinets[selection], self._h_divider_rails, 'Korpus', 'Rails',
+            inner_width[selection], self.rail_width, h_dividers[selection],
+            'jedna duza'
+        )
+        shelves = self._lengths('shelves')[cabinets]
+        selection = shelves > 0
+        self._add_block(
+            cabinets[selection], self._shelves, 'Korpus', 'Shelves',
+            inner_width[selection], shelf_depth[selection],
+            shelves[selection] - h_dividers[selection] - 1,
+            shelf_banding[selection]
+        )
+        self._drawer_boxes(cupboard, slide_relief=25, with_front=False)
+        door_cabinets, items, sections = self._explode('sections', cupboard)
+        _, _, doors = self._explode('doors_per_section', cupboard)
+        doors = doors.astype(np.int64)
+        self._add_block(
+            door_cabinets, self._doors, 'Front', 'Door', sections - 3,
+            (self._width[door_cabinets]/doors) - 3, doors, 'u krug',
+            item=items
+        )
+
+    def _assemble(self) -> pd.DataFrame:
+        if not self._blocks:
+            return pd.DataFrame()
+        columns = {
+            key: np.concatenate([block[key] for block in self._blocks])
+            for key in self._blocks[0]
+        }
+        order = np.lexsort((
+            columns['sub'],
+            columns['item'],
+            columns['block'],
+            columns['cabinet']
+        ))
+        cabinets = columns['cabinet'][order]
+        starts = np.searchsorted(cabinets, cabinets, side='left')
+        rows = np.arange(len(cabinets)) - starts
+        # Dimensions are integers unless any of them is computed as a
+        # float, such as widths of doors, as in the tables of material of
+        # single cabinets.
+        x, y = (
+            columns[name][order] if self._floats[name]
+            else columns[name][order].astype(np.int64)
+            for name in ('x', 'y')
+        )
+        index = pd.MultiIndex.from_arrays([
+            self.specs.index.to_numpy()[cabinets],
+            rows
+        ])
+
+        return pd.DataFrame({
+            0: columns['material'][order],
+            1: columns['part'][order],
+            2: x,
+            3: y,
+            4: columns['units'][order],
+            5: columns['banding'][order]
+        }, index=index)
+
+    def compute_total_material(self) -> pd.DataFrame:
+        """Combined cut list of all cabinets
+
+        Returns
+        -------
+        pd.DataFrame
+            Cut list indexed by the specification label of the cabinet
+            and the row number within the cabinet. Selecting a single
+            cabinet returns the same rows as its construction class.
+
+        """
+        self._blocks = []
+        self._floats = {'x': False, 'y': False}
+        self._prepare_specs()
+        self._validate_dimensions()
+        self._corpus()
+        self._floor()
+        self._wall()
+        self._cupboard()
+
+        return self._assemble()
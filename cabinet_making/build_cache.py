@@ -0,0 +1,265 @@
+"""On-disk cache of made cabinets
+
+Usage::
+
+    python -m cabinet_making.build_cache invalidate [CABINET ...]
+    python -m cabinet_making.build_cache gc [--max-age-days DAYS]
+
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from cabinet_making.cabinet_maker import CabinetMaker
+from cabinet_making.instrumentation import Instrumentation, disabled
+
+
+@lru_cache(maxsize=None)
+def library_version() -> str:
+    """Hash of the source of `cabinet_making`
+
+    Any change of the library invalidates cached cabinets, as there is no
+    release version to rely on.
+
+    """
+    digest = hashlib.sha256()
+    for source in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(source.name.encode())
+        digest.update(source.read_bytes())
+
+    return digest.hexdigest()
+
+
+def _file_hash(path: Path) -> str:
+
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class BuildCache:
+    """Stages of cabinets skipped when their inputs did not change
+
+    Every stage of a cabinet is keyed on a hash of the canonical spec of
+    the cabinet, the stage, and the version of the library. An entry
+    records the files the stage wrote, with their hashes, and for the
+    material stage the computed material. A stage is skipped while its
+    entry exists and its files are unchanged.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Directory of cache entries.
+
+    """
+
+    output_files = {
+        'elevation': '{}_elevation.xlsx',
+        'plot': '{}_section_and_elevation.pdf'
+    }
+
+    def __init__(self, cache_dir: str = '.cabinet_cache') -> None:
+        self.cache_dir = Path(cache_dir)
+
+    def _key(self, spec: dict, stage: str) -> str:
+        canonical = json.dumps(
+            {'spec': spec, 'stage': stage, 'version': library_version()},
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        )
+
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _read_entry(self, key: str) -> dict:
+        entry_file = self.cache_dir / f'{key}.json'
+        if not entry_file.exists():
+            return None
+        entry = json.loads(entry_file.read_text())
+        if entry['stage'] == 'material' \
+                and not (self.cache_dir / f'{key}.pkl').exists():
+            return None
+        for output, output_hash in entry['outputs'].items():
+            output = Path(output)
+            if not output.exists() or _file_hash(output) != output_hash:
+                return None
+
+        return entry
+
+    def _write_entry(self, key: str, spec: dict, stage: str, material=None):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        outputs = {}
+        if stage in self.output_files:
+            output = Path(self.output_files[stage].format(spec['cabinet_name']))
+            outputs[str(output)] = _file_hash(output)
+        # Written aside and renamed, as workers share the directory, and
+        # an interrupted write must not leave a truncated entry.
+        if material is not None:
+            temporary = self.cache_dir / f'{key}.{os.getpid()}.pkl.tmp'
+            material.to_pickle(temporary)
+            os.replace(temporary, self.cache_dir / f'{key}.pkl')
+        entry = {
+            'cabinet_name': spec['cabinet_name'],
+            'stage': stage,
+            'version': library_version(),
+            'created': time.time(),
+            'outputs': outputs
+        }
+        temporary = self.cache_dir / f'{key}.{os.getpid()}.tmp'
+        temporary.write_text(json.dumps(entry))
+        os.replace(temporary, self.cache_dir / f'{key}.json')
+
+    def _read_material(self, key: str):
+        import pandas as pd
+
+        return pd.read_pickle(self.cache_dir / f'{key}.pkl')
+
+    def make_cabinet(self,
+                     spec: dict,
+                     stages: tuple[str],
+                     instrumentation: Instrumentation = disabled) -> dict:
+        """Make the stages of a cabinet which are not cached
+
+        Parameters
+        ----------
+        spec : dict
+            Keyword arguments of `CabinetMaker`.
+        stages : tuple[str]
+            Stages to run, see `ProjectMaker`.
+        instrumentation : Instrumentation, optional
+            Recording the stages which are not cached, by default
+            nothing is recorded.
+
+        Returns
+        -------
+        dict
+            Computed or cached material, and the skipped stages.
+
+        """
+        keys = {stage: self._key(spec, stage) for stage in stages}
+        cached = [
+            stage for stage in stages
+            if self._read_entry(keys[stage]) is not None
+        ]
+        pending = [stage for stage in stages if stage not in cached]
+        material = None
+        if 'material' in cached:
+            material = self._read_material(keys['material'])
+        if pending:
+            cabinet_maker = CabinetMaker(
+                **spec, instrumentation=instrumentation
+            )
+            # Drawings tabulate the material.
+            cabinet_maker.measurements = material
+            cabinet_maker.make_cabinet(
+                plot='plot' in pending,
+                write_elevation='elevation' in pending,
+                material=material is None and (
+                    'material' in pending or 'plot' in pending
+                ),
+                elevation=False
+            )
+            material = cabinet_maker.measurements
+            for stage in pending:
+                self._write_entry(
+                    keys[stage],
+                    spec,
+                    stage,
+                    material=material if stage == 'material' else None
+                )
+
+        return {
+            'material': material if 'material' in stages else None,
+            'cached': cached
+        }
+
+    def _entries(self):
+        for entry_file in list(self.cache_dir.glob('*.json')):
+            yield entry_file, json.loads(entry_file.read_text())
+
+    def _remove(self, entry_file: Path):
+        entry_file.unlink(missing_ok=True)
+        entry_file.with_suffix('.pkl').unlink(missing_ok=True)
+
+    def invalidate(self, cabinet_names: list[str] = None) -> int:
+        """Remove entries, so that their stages are made again
+
+        Parameters
+        ----------
+        cabinet_names : list[str], optional
+            Cabinets to invalidate, by default all of them.
+
+        Returns
+        -------
+        int
+            Count of removed entries.
+
+        """
+        removed = 0
+        for entry_file, entry in self._entries():
+            if cabinet_names is None or entry['cabinet_name'] in cabinet_names:
+                self._remove(entry_file)
+                removed += 1
+
+        return removed
+
+    def collect_garbage(self, max_age_days: float = None) -> int:
+        """Remove entries which can not be used anymore
+
+        Entries of other versions of the library, entries with changed
+        or missing files, and optionally entries older than given age
+        are removed, with files left behind by interrupted writes.
+
+        Returns
+        -------
+        int
+            Count of removed entries.
+
+        """
+        removed = 0
+        oldest = None if max_age_days is None \
+            else time.time() - max_age_days*24*3600
+        for entry_file, entry in self._entries():
+            key = entry_file.stem
+            if entry['version'] != library_version() \
+                    or self._read_entry(key) is None \
+                    or (oldest is not None and entry['created'] < oldest):
+                self._remove(entry_file)
+                removed += 1
+        for temporary in self.cache_dir.glob('*.tmp'):
+            temporary.unlink(missing_ok=True)
+
+        return removed
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Invalidate or clean up the build cache.'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default='.cabinet_cache',
+        help='Directory of the build cache.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    invalidate = commands.add_parser(
+        'invalidate', help='Remove entries of cabinets, or all entries.'
+    )
+    invalidate.add_argument('cabinet_names', nargs='*')
+    gc = commands.add_parser('gc', help='Remove entries of no use.')
+    gc.add_argument('--max-age-days', type=float, default=None)
+    arguments = parser.parse_args(argv)
+    build_cache = BuildCache(cache_dir=arguments.cache_dir)
+    if arguments.command == 'invalidate':
+        removed = build_cache.invalidate(arguments.cabinet_names or None)
+    else:
+        removed = build_cache.collect_garbage(arguments.max_age_days)
+    print(f'Removed {removed} cache entries.')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
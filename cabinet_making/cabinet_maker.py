@@ -1,7 +1,6 @@
 from pathlib import Path
 from cabinet_making.constructions import FloorCabinet, WallCabinet, Cupboard
-from cabinet_making.measurements import CupboardElevation
-from cabinet_making.plots import CabinetPlotter
+from cabinet_making.instrumentation import Instrumentation, disabled
 
 
 class CabinetMaker:
@@ -11,6 +10,9 @@ class CabinetMaker:
     in order to reduce duplication, make code more compact, and easier
     to use.
 
+    Stages of `make_cabinet` are recorded by `instrumentation`, see
+    `get_report`. By default nothing is recorded.
+
     """
 
     def __init__(self,
@@ -26,7 +28,8 @@ class CabinetMaker:
                  drawer_reference: int = 0,
                  drawer_front: list[int] = None,
                  sections: list[int] = None,
-                 doors_per_section: list[int] = None) -> None:
+                 doors_per_section: list[int] = None,
+                 instrumentation: Instrumentation = disabled) -> None:
         self.cabinet_type = cabinet_type
         self.cabinet_name = cabinet_name
         self.orientation = orientation
@@ -64,8 +67,12 @@ class CabinetMaker:
         self.measurements = None
         self.cabinet = None
         self.plotter = None
+        self.instrumentation = instrumentation
+
+    def _make_elevation(self, write: bool = True):
+        # Imported on first use, as it loads pandas.
+        from cabinet_making.measurements import CupboardElevation
 
-    def _make_elevation(self):
         elevation_file = Path(self.cabinet_name + '_elevation.xlsx')
         self.cabinet = CupboardElevation(
             height=self.height_mm,
@@ -74,13 +81,17 @@ class CabinetMaker:
             drawers=self.drawer_front,
             dividers=self.dividers,
             shelves=self.shelves,
-            drawer_reference=self.drawer_reference
+            drawer_reference=self.drawer_reference,
+            instrumentation=self.instrumentation
         )
         self.cabinet.compute_elevation()
-        self.cabinet.write_elevation()
+        if write:
+            self.cabinet.write_elevation()
+
+    def _make_plotter(self):
+        # Imported on first use, as it loads matplotlib.
+        from cabinet_making.plots import CabinetPlotter
 
-    def _plotting(self):
-        plot_file = Path(self.cabinet_name + '_section_and_elevation.pdf')
         self.plotter = CabinetPlotter(
             cabinet_type=self.cabinet_type,
             orientation=self.orientation,
@@ -96,7 +107,12 @@ class CabinetMaker:
             doors_per_section=self.doors_per_section,
             section_pairs=self.cabinet.get_section_indications(),
             system_holes=self.cabinet.get_system_holes(),
+            instrumentation=self.instrumentation
         )
+
+    def _plotting(self):
+        plot_file = Path(self.cabinet_name + '_section_and_elevation.pdf')
+        self._make_plotter()
         self.plotter.plot_cabinet(compute_only=True, plot_file=plot_file)
 
     def _compute_material(self):
@@ -133,8 +149,66 @@ class CabinetMaker:
 
         material = measurements.compute_total_material()
         self.measurements = material
+        if self.instrumentation.enabled:
+            self.instrumentation.count('parts', len(material))
+            self.instrumentation.count('part_units', int(material[4].sum()))
  
-    def make_cabinet(self):
-        self._compute_material()
-        self._make_elevation()
-        self._plotting()
+    def make_cabinet(self,
+                     plot: bool = True,
+                     write_elevation: bool = True,
+                     material: bool = True,
+                     elevation: bool = True):
+        """Compute material and elevation, and plot the cabinet
+
+        Parameters
+        ----------
+        plot : bool, optional
+            Write the drawing of the cabinet to its own file, by default
+            True. Otherwise, the plotter is prepared on request only, see
+            `get_plotter`.
+        write_elevation : bool, optional
+            Write the elevation of the cabinet to its own workbook, by
+            default True. Otherwise, the elevation is only computed, for
+            example for `ProjectWorkbook`.
+        material : bool, optional
+            Compute material of the cabinet, by default True.
+        elevation : bool, optional
+            Compute the elevation of the cabinet, by default True. It is
+            computed regardless when written or plotted.
+
+        """
+        if material:
+            with self.instrumentation.stage('material'):
+                self._compute_material()
+        if elevation or write_elevation or plot:
+            with self.instrumentation.stage('elevation'):
+                self._make_elevation(write=write_elevation)
+        if plot:
+            with self.instrumentation.stage('plot'):
+                self._plotting()
+
+    def get_plotter(self):
+        """Plotter of the cabinet, prepared on first request
+
+        Returns
+        -------
+        CabinetPlotter
+            Plotter of the made cabinet, for example for `ProjectBook`.
+
+        """
+        if self.plotter is None:
+            self._make_plotter()
+
+        return self.plotter
+
+    def get_report(self) -> dict:
+        """Seconds per stage and counters of the made cabinet
+
+        Returns
+        -------
+        dict
+            Report of `instrumentation`, None when disabled.
+
+        """
+
+        return self.instrumentation.get_report()
@@ -0,0 +1,129 @@
+"""Command line entry point, making every cabinet of a project spec
+
+Usage::
+
+    python main.py project.json --stages material,elevation --workers 4
+
+One JSON line per cabinet is written to standard output as soon as the
+cabinet is finished, so that the output can be piped into other tools.
+Workbooks and drawings are written into the working directory.
+
+"""
+import argparse
+import json
+import sys
+from cabinet_making.parts import to_json
+from cabinet_making.project_maker import ProjectMaker
+from cabinet_making.project_spec import ProjectSpec
+
+
+def _parse_arguments(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Make material, elevations, and drawings of a project.'
+    )
+    parser.add_argument(
+        'spec_file',
+        help='Project spec, as a .json, .jsonl, .yaml, or .yml file.'
+    )
+    parser.add_argument(
+        '--stages',
+        default=','.join(ProjectMaker.stages),
+        help='Comma separated stages to run, out of '
+             f'{", ".join(ProjectMaker.stages)}. By default all of them.'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes, by default number of processors.'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='Directory of the build cache, skipping stages of unchanged '
+             'cabinets. By default no cache.'
+    )
+    parser.add_argument(
+        '--instrument',
+        action='store_true',
+        help='Add seconds per stage and counters to every line, and write '
+             'their sums over the project to standard error.'
+    )
+    parser.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='As --instrument, also with peak and retained memory per '
+             'stage, and the sites retaining most memory.'
+    )
+    arguments = parser.parse_args(argv)
+    arguments.stages = tuple(
+        stage.strip() for stage in arguments.stages.split(',') if stage
+    )
+    for stage in arguments.stages:
+        if stage not in ProjectMaker.stages:
+            parser.error(f'Stage {stage} not known.')
+
+    return arguments
+
+
+def _result_line(cabinet: dict, result: dict) -> str:
+    material = result['material']
+
+    return json.dumps({
+        'room': cabinet.get('room'),
+        'section': cabinet.get('section'),
+        'cabinet_name': result['cabinet_name'],
+        'status': result['status'],
+        'error': result['error'],
+        'cached': result['cached'],
+        'material': None if material is None else material.values.tolist(),
+        'report': result['report']
+    }, default=to_json)
+
+
+def main(argv: list[str] = None) -> int:
+    """Make every cabinet of a project spec
+
+    Parameters
+    ----------
+    argv : list[str], optional
+        Arguments, by default those of the command line.
+
+    Returns
+    -------
+    int
+        Exit status, 1 if any cabinet failed.
+
+    """
+    arguments = _parse_arguments(argv)
+    project_spec = ProjectSpec(spec_file=arguments.spec_file)
+    cabinets = {
+        cabinet['cabinet_name']: cabinet
+        for cabinet in project_spec.read_spec()
+    }
+
+    def write_result(finished: int, total: int, result: dict):
+        cabinet = cabinets[result['cabinet_name']]
+        sys.stdout.write(_result_line(cabinet, result) + '\n')
+        sys.stdout.flush()
+
+    project_maker = ProjectMaker(
+        cabinets=project_spec.get_maker_specs(),
+        max_workers=arguments.workers,
+        progress=write_result,
+        stages=arguments.stages,
+        cache_dir=arguments.cache_dir,
+        instrument=arguments.instrument,
+        profile_memory=arguments.profile_memory
+    )
+    results = project_maker.make_project()
+    if arguments.instrument or arguments.profile_memory:
+        report = project_maker.get_report()
+        del report['cabinets']
+        sys.stderr.write(json.dumps(report) + '\n')
+
+    return int(any(result['status'] != 'done' for result in results))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+import numpy as np
+from cabinet_making.cabinet_maker import CabinetMaker
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+# Values of dictionary columns, fixed so that every batch of every
+# project shares a single dictionary per column.
+dictionary_values = {
+    'material': ['Korpus', 'Lesonit', 'Front'],
+    'indication': [
+        'hinge_indication',
+        'drawer_indication',
+        'shelf_indication',
+        'divider_indication'
+    ]
+}
+
+
+def _schemas() -> dict:
+    """Schemas of the tables of an archive, fixed across projects
+
+    Dimensions are always floats, so that fractional door widths and
+    whole dimensions share a type. Dictionary columns are indexed by
+    32-bit integers, as Parquet reads them back.
+
+    """
+    # Optional dependency, needed for columnar archives only.
+    import pyarrow as pa
+
+    location = [
+        pa.field('project', pa.string(), nullable=False),
+        pa.field('room', pa.string()),
+        pa.field('section', pa.string()),
+        pa.field('cabinet_name', pa.string(), nullable=False)
+    ]
+
+    return {
+        'cut_list': pa.schema(location + [
+            pa.field('row', pa.int32(), nullable=False),
+            pa.field('material', pa.dictionary(pa.int32(), pa.string())),
+            pa.field('part', pa.string()),
+            pa.field('x', pa.float64()),
+            pa.field('y', pa.float64()),
+            pa.field('units', pa.int32()),
+            pa.field('banding', pa.string())
+        ]),
+        'holes': pa.schema(location + [
+            pa.field('position', pa.int32(), nullable=False),
+            pa.field('indication', pa.dictionary(pa.int32(), pa.string())),
+            pa.field('label', pa.string())
+        ])
+    }
+
+
+class ProjectArchive:
+    """Cut lists and hole maps of a project, written as columnar files
+
+    Every table of the project is written to its own file within the
+    directory of the project, `<archive_dir>/<project>/<table>.<format>`,
+    so that an archive holds many projects, see `ArchiveReader`. Tables
+    share a typed schema across projects. Cabinets are streamed in
+    batches, so that memory does not depend on the number of cabinets.
+
+    Parameters
+    ----------
+    archive_dir : str
+        Directory of the archive.
+    project : str
+        Name of the project.
+    cabinets : Iterable[CabinetMaker]
+        Cabinets of the project, possibly a generator. Cabinets which
+        are not made yet, are made without writing their own files.
+    file_format : str, optional
+        `parquet`, or `arrow` for Arrow IPC files, by default `parquet`.
+    locations : dict, optional
+        Room and section of cabinets, by name of the cabinet, as read by
+        `ProjectSpec`.
+    batch_size : int, optional
+        Cabinets per written batch, by default 256.
+
+    """
+
+    formats = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+    def __init__(self,
+                 archive_dir: str = None,
+                 project: str = None,
+                 cabinets: Iterable[CabinetMaker] = None,
+                 file_format: str = 'parquet',
+                 locations: dict = None,
+                 batch_size: int = 256) -> None:
+        assert file_format in self.formats, \
+            f'Format {file_format} not known.'
+        self.archive_dir = archive_dir
+        self.project = project
+        self.cabinets = cabinets
+        self.file_format = file_format
+        self.locations = locations if locations else {}
+        self.batch_size = batch_size
+        self._schemas = None
+        self._writers = None
+
+    def get_file(self, table: str) -> Path:
+
+        return Path(self.archive_dir) / self.project \
+            / f'{table}{self.formats[self.file_format]}'
+
+    def _open_writers(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._schemas = _schemas()
+        self._writers = {}
+        for table, schema in self._schemas.items():
+            table_file = self.get_file(table)
+            table_file.parent.mkdir(parents=True, exist_ok=True)
+            if self.file_format == 'parquet':
+                self._writers[table] = pq.ParquetWriter(table_file, schema)
+            else:
+                self._writers[table] = pa.ipc.new_file(str(table_file), schema)
+
+    def _location_columns(self, cabinet: CabinetMaker, count: int) -> dict:
+        location = self.locations.get(cabinet.cabinet_name, {})
+
+        return {
+            'project': [self.project]*count,
+            'room': [location.get('room')]*count,
+            'section': [location.get('section')]*count,
+            'cabinet_name': [str(cabinet.cabinet_name)]*count
+        }
+
+    def _cut_list_columns(self, cabinet: CabinetMaker) -> dict:
+        material = cabinet.measurements
+
+        return {
+            **self._location_columns(cabinet, len(material)),
+            'row': np.arange(len(material), dtype=np.int32),
+            'material': material[0].tolist(),
+            'part': material[1].tolist(),
+            'x': material[2].to_numpy(dtype=np.float64),
+            'y': material[3].to_numpy(dtype=np.float64),
+            'units': material[4].to_numpy(dtype=np.int32),
+            'banding': material[5].tolist()
+        }
+
+    def _holes_columns(self, cabinet: CabinetMaker) -> dict:
+        hole_map = cabinet.cabinet.get_hole_map()
+
+        return {
+            **self._location_columns(cabinet, len(hole_map['positions'])),
+            'position': hole_map['positions'].astype(np.int32),
+            'indication': hole_map['indications'].tolist(),
+            'label': hole_map['labels'].tolist()
+        }
+
+    def _dictionary_array(self, name: str, values: pa.Array) -> pa.Array:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        dictionary = pa.array(dictionary_values[name], type=pa.string())
+        indices = pc.index_in(values, value_set=dictionary)
+        assert indices.null_count == values.null_count, \
+            f'Value of {name} not in {dictionary_values[name]}.'
+
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+    def _write_batch(self, table: str, batch: list[dict]):
+        import pyarrow as pa
+
+        schema = self._schemas[table]
+        columns = []
+        for field in schema:
+            dictionary = pa.types.is_dictionary(field.type)
+            value_type = field.type.value_type if dictionary else field.type
+            column = pa.chunked_array(
+                [pa.array(columns[field.name], type=value_type)
+                 for columns in batch],
+                type=value_type
+            ).combine_chunks()
+            if dictionary:
+                column = self._dictionary_array(field.name, column)
+            columns.append(column)
+        self._writers[table].write_table(
+            pa.Table.from_arrays(columns, schema=schema)
+        )
+
+    def write_archive(self):
+        self._open_writers()
+        batches = {table: [] for table in self._schemas}
+        try:
+            for cabinet in self.cabinets:
+                if cabinet.cabinet is None:
+                    cabinet.make_cabinet(plot=False, write_elevation=False)
+                batches['cut_list'].append(self._cut_list_columns(cabinet))
+                batches['holes'].append(self._holes_columns(cabinet))
+                if len(batches['cut_list']) == self.batch_size:
+                    for table, batch in batches.items():
+                        self._write_batch(table, batch)
+                        batch.clear()
+            for table, batch in batches.items():
+                if batch:
+                    self._write_batch(table, batch)
+        finally:
+            for writer in self._writers.values():
+                writer.close()
+
+
+class ArchiveReader:
+    """Tables of an archive of many projects, read on demand
+
+    Files are scanned as datasets, reading only the selected columns and
+    the columns of the filter. Arrow IPC files are memory-mapped, so that only
+    the pages of the selected columns are read. Parquet files are read
+    with the filter pushed down to their row groups.
+
+    Parameters
+    ----------
+    archive_dir : str
+        Directory of the archive, see `ProjectArchive`.
+
+    """
+
+    def __init__(self, archive_dir: str = None) -> None:
+        self.archive_dir = archive_dir
+
+    def get_projects(self) -> list[str]:
+
+        return sorted(
+            path.name for path in Path(self.archive_dir).iterdir()
+            if path.is_dir()
+        )
+
+    def _read_file(self,
+                   table_file: Path,
+                   columns: list[str],
+                   expression) -> pa.Table:
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        dataset = ds.dataset(
+            str(table_file),
+            format='parquet' if table_file.suffix == '.parquet' else 'ipc',
+            filesystem=fs.LocalFileSystem(use_mmap=True)
+        )
+
+        return dataset.to_table(columns=columns, filter=expression)
+
+    def read_table(self,
+                   table: str = 'cut_list',
+                   projects: list[str] = None,
+                   columns: list[str] = None,
+                   expression=None) -> pa.Table:
+        """Rows of a table over projects of the archive
+
+        Parameters
+        ----------
+        table : str, optional
+            `cut_list` or `holes`, by default `cut_list`.
+        projects : list[str], optional
+            Projects to read, by default all of them.
+        columns : list[str], optional
+            Columns to read, by default all of them.
+        expression : pyarrow.compute.Expression, optional
+            Filter of rows, for example
+            `pc.field('material') == 'Front'`.
+
+        Returns
+        -------
+        pa.Table
+            Selected rows and columns, in the schema of the table.
+
+        """
+        import pyarrow as pa
+
+        tables = []
+        for project in projects if projects else self.get_projects():
+            for table_file in sorted(
+                (Path(self.archive_dir) / project).glob(f'{table}.*')
+            ):
+                tables.append(self._read_file(table_file, columns, expression))
+        if not tables:
+            schema = _schemas()[table]
+            return schema.empty_table().select(columns) if columns \
+                else schema.empty_table()
+
+        return pa.concat_tables(tables)
+
+    def read_parts(self,
+                   projects: list[str] = None,
+                   materials: list[str] = None,
+                   columns: list[str] = None) -> pa.Table:
+        """Parts of the cut lists, optionally of some materials only
+
+        Returns
+        -------
+        pa.Table
+            Selected parts, see `read_table`.
+
+        """
+        import pyarrow.compute as pc
+
+        expression = None
+        if materials:
+            expression = pc.field('material').isin(materials)
+
+        return self.read_table('cut_list', projects, columns, expression)
@@ -1,5 +1,8 @@
-import pandas as pd
+import threading
+from collections import OrderedDict
+import numpy as np
 from cabinet_making.base_classes import BaseCorpus
+from cabinet_making.parts import PartList, make_part, part_dtype
 
 class Corpus(BaseCorpus):
     """Dimensions and edge banding according to Corpus type
@@ -25,7 +28,7 @@ class Corpus(BaseCorpus):
         self.top_type = top_type
         self.back = back
         self.inner_width = None
-        self.material = []
+        self.material = PartList()
         self.side_edge_banding = "N/A"
         self.top_bottom_edge_banding = "N/A"
         self.top_front_stretcher_banding = "N/A"
@@ -39,53 +42,53 @@ class Corpus(BaseCorpus):
  
     def _sides(self):
 
-        self.material.append([
+        self.material.append(
             'Korpus',
             'Sides', 
             self.height, 
             self.depth, 
             2,
             self.side_edge_banding
-        ])
+        )
     
     def _one_piece_top(self):
 
-        self.material.append([
+        self.material.append(
             'Korpus',
             'Top/bottom', 
             self.inner_width, 
             self.depth,
             2,
             self.top_bottom_edge_banding
-        ])
+        )
     
     def _two_piece_top(self):
         
-        self.material.extend([  
-            [   
+        self.material.extend([
+            make_part(
                 'Korpus',
                 'Bottom', 
                 self.inner_width,
                 self.depth, 
                 1, 
                 self.top_bottom_edge_banding
-            ],
-            [
+            ),
+            make_part(
                 'Korpus',
                 'Top front/back stretcher', 
                 self.inner_width, 
                 96, 
                 1, 
                 self.top_front_stretcher_banding
-            ],
-            [
+            ),
+            make_part(
                 'Korpus',
                 'Top front/back stretcher', 
                 self.inner_width, 
                 96, 
                 1, 
                 self.top_back_stretcher_banding
-            ]
+            )
         ])
     
     def _top_and_bottom(self):
@@ -103,14 +106,14 @@ class Corpus(BaseCorpus):
 
         material_remainder = 10
 
-        self.material.append([
+        self.material.append(
             'Lesonit',
             'Back', 
             self.height - (2*material_remainder) - self.back_tolerance, 
             self.width - (2*material_remainder) - self.back_tolerance, 
             1,
             'No edge banding'
-        ])
+        )
 
 
     def _back(self):
@@ -119,14 +122,14 @@ class Corpus(BaseCorpus):
         """
         material_remainder = 6
 
-        self.material.append([
+        self.material.append(
             'Lesonit',
             'Back', 
             self.height - (2*material_remainder) - self.back_tolerance, 
             self.width - (2*material_remainder) - self.back_tolerance, 
             1,
             'No edge banding'
-        ])
+        )
 
     def _validate_dimensions(self):
 
@@ -137,7 +140,7 @@ class Corpus(BaseCorpus):
     def _rails(self):
 
         self.material.append(
-            ['Korpus', 'Rails', self.inner_width, 96, 2, 'jedna duza']
+            'Korpus', 'Rails', self.inner_width, 96, 2, 'jedna duza'
         )
 
     def _banding(self):
@@ -158,7 +161,7 @@ class Corpus(BaseCorpus):
             self.top_back_stretcher_banding = 'dve krace'
             self.top_front_stretcher_banding = 'dve krace'
 
-    def compute_corpus_material(self):
+    def _compute_corpus_parts(self):
         self._validate_dimensions()
         self._compute_inner_width()
         self._banding()
@@ -168,7 +171,22 @@ class Corpus(BaseCorpus):
             self._back()
         self._rails()
 
-        return pd.DataFrame.from_records(self.material)
+    def compute_corpus_material(self):
+        self._compute_corpus_parts()
+
+        return self.material.to_frame()
+
+    def get_parts(self) -> np.ndarray:
+        """Parts computed so far, as typed records
+
+        Returns
+        -------
+        np.ndarray
+            Records of `part_dtype`.
+
+        """
+
+        return self.material.get_records()
 
 
 class WallCabinet(Corpus):
@@ -224,14 +242,14 @@ class WallCabinet(Corpus):
         self._compute_shelf_depth()
         self._shelf_edge_banding()
 
-        return pd.DataFrame.from_records([[
+        self.material.append(
             'Korpus',
             'Shelves', 
             self.inner_width, 
             self.shelf_depth, 
             len(self.shelves),  # Shelve count.
             self.shelf_edge_banding
-        ]])
+        )
     
     def _doors(self):
         vertical_relief = 0
@@ -239,14 +257,14 @@ class WallCabinet(Corpus):
         door_width = (self.width/self.doors) - horizontal_relief
         door_height = self.height - vertical_relief
         
-        return pd.DataFrame.from_records([[
+        self.material.append(
             'Front',
             'Door', 
             door_height, 
             door_width, 
             self.doors, 
             self.door_edge_banding
-        ]])
+        )
     
     def _sides_edge_banding(self):
         if self.height > self.depth:
@@ -256,15 +274,12 @@ class WallCabinet(Corpus):
 
     def compute_total_material(self):
         self._sides_edge_banding()
-        corpus_material = super().compute_corpus_material()
-        shelves = pd.DataFrame()  # Place-holder.
+        super()._compute_corpus_parts()
         if self.shelves:
-            shelves = self._shelves()
-        doors = self._doors()
-        material = pd.concat([corpus_material, shelves, doors])
-        material.reset_index(inplace=True, drop=True)
+            self._shelves()
+        self._doors()
 
-        return material
+        return self.material.to_frame()
 
 
 class FloorCabinet(Corpus):
@@ -318,7 +333,7 @@ class FloorCabinet(Corpus):
         slide_relief = 26  # Attention!
         back_relief = 50
 
-        drawer = Drawer(
+        drawer_parts = drawer_cache.get_parts(
             height=front_height,
             width=self.width,
             depth=self.depth,
@@ -328,63 +343,38 @@ class FloorCabinet(Corpus):
             back_relief=back_relief
         )
 
-        drawer.compute_material()
-        box_sides = drawer.get_drawer_box_sides()
-        box_front_back = drawer.get_drawer_front_back()
-        back = drawer.get_drawer_bottom()     
-        front = drawer.get_drawer_front()
-
-        return pd.DataFrame.from_records([
-            box_sides, box_front_back, front, back
-        ])
+        self.material.extend(drawer_parts)
     
     def _compute_drawers(self):
-        drawers = []
         for drawer in self.drawers:
-            drawer = self._compute_drawer(front_height=drawer)
-            drawers.extend([drawer])
-
-        return pd.concat(drawers)
+            self._compute_drawer(front_height=drawer)
     
-    def _compute_doors(self) -> pd.DataFrame:
-        """_summary_
-
-        Returns
-        -------
-        pd.DataFrame
-            _description_
-
-        """
-        doors = []
+    def _compute_doors(self):
         for index, section_height in enumerate(self.sections):
             doors_per_section = self.doors_per_section[index]
             if doors_per_section == 0:
                 pass
             if doors_per_section >= 1:
                 width = (self.width/doors_per_section) - 3
-                doors.append([
+                self.material.append(
                     'Front',
                     f'Section {section_height}, door',
                     width,
                     section_height - 3,
                     doors_per_section,
                     'u krug'
-                ])
-
-        return pd.DataFrame.from_records(doors)
+                )
 
-    def _compute_stretchers(self) -> list:
+    def _compute_stretchers(self):
         
-        return pd.DataFrame.from_records(
-                [[
-                    'Korpus',
-                    'Drawer stretcher',
-                    self.inner_width,
-                    96,
-                    len(self.drawers) - 1,
-                    self.drawer_stretcher_banding
-                ]]
-            )
+        self.material.append(
+            'Korpus',
+            'Drawer stretcher',
+            self.inner_width,
+            96,
+            len(self.drawers) - 1,
+            self.drawer_stretcher_banding
+        )
     def _validate_section_dimensions(self):
         """Vaildates dimensions of individual sections
 
@@ -400,33 +390,16 @@ class FloorCabinet(Corpus):
 
     def compute_total_material(self):
         self._validate_section_dimensions()        
-        corpus_material = super().compute_corpus_material()
-        output = corpus_material  # Mandatory.
-        drawers = pd.DataFrame()  # Place-holder.
-        drawer_stretcher = pd.DataFrame()  # Placeholder.
-        doors = pd.DataFrame()  # Place-holder.
+        super()._compute_corpus_parts()  # Mandatory.
         if self.drawers:
-            drawers = self._compute_drawers()
-            output = pd.concat([corpus_material, drawers])
+            self._compute_drawers()
             if len(self.drawers) > 2:
                 self._drawer_stretcher_banding()
-                drawer_stretcher = self._compute_stretchers()
-                output = pd.concat([
-                    corpus_material, 
-                    drawers, 
-                    drawer_stretcher
-                ])
+                self._compute_stretchers()
         if self.doors:
-            doors = self._compute_doors()
-            output = pd.concat([
-                corpus_material, 
-                drawers, 
-                drawer_stretcher, 
-                doors
-            ])
-        output.reset_index(inplace=True, drop=True)
+            self._compute_doors()
 
-        return output
+        return self.material.to_frame()
 
 
 class Drawer(BaseCorpus):
@@ -483,53 +456,159 @@ class Drawer(BaseCorpus):
 
     def get_drawer_box_sides(self):
         
-        return [
+        return make_part(
             'Korpus',
             'Drawer, box (side)',
             self.drawer_box_depth,
             self.drawer_box_height,
             2*self.count,
             self.side_edge_banding
-        ]
+        )
 
     def get_drawer_front_back(self):
         
-        return [
+        return make_part(
             'Korpus',
             'Drawer, box (face/back)',
             self.drawer_box_inner_width,
             self.drawer_box_height,
             2*self.count,
             self.top_bottom_edge_banding
-        ]
+        )
 
     def get_drawer_front(self):
         
-        return [
+        return make_part(
             'Front',
             'Drawer, front',
             self.drawer_front_width,
             self.drawer_front_height,
             1*self.count,
             self.drawer_front_banding
-        ]
+        )
 
     def get_drawer_bottom(self):
         
-        return [
+        return make_part(
             'Lesonit',
             'Drawer, box (bottom)',
             self.drawer_bottom_width,
             self.drawer_bottom_depth,
             1*self.count,
             'No banding'
-        ]
+        )
     
     def compute_material(self):
         self._compute_dimensions()
         self._compute_banding()
         self._compute_bottom()
 
+
+class DrawerCache:
+    """Parts of recently computed drawers
+
+    Cabinets of a project mostly repeat the same fronts on the same
+    carcasses, so the parts of a drawer are computed once per distinct
+    set of inputs of `Drawer`, and looked up afterwards. The least
+    recently used drawer is dropped once the cache is full. The cache is
+    shared by threads, its entries and counts are updated under a lock,
+    while drawers are computed outside of it.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Number of distinct drawers kept.
+
+    """
+
+    # Order of parts of a single drawer.
+    box_sides = 0
+    box_front_back = 1
+    front = 2
+    bottom = 3
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._parts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_parts(self,
+                  height: int,
+                  width: int,
+                  depth: int,
+                  count: int = 1,
+                  back_tolerance: int = 2,
+                  top_relief: int = 0,
+                  slide_relief: int = 26,
+                  back_relief: int = 50) -> np.ndarray:
+        """Box sides, box face and back, front, and bottom of a drawer
+
+        Returns
+        -------
+        np.ndarray
+            Read-only records of `part_dtype`.
+
+        """
+        key = (
+            height, width, depth, back_tolerance, top_relief, slide_relief,
+            back_relief, count
+        )
+        with self._lock:
+            parts = self._parts.get(key)
+            if parts is not None:
+                self.hits += 1
+                self._parts.move_to_end(key)
+
+                return parts
+            self.misses += 1
+        drawer = Drawer(
+            height=height,
+            width=width,
+            depth=depth,
+            count=count,
+            back_tolerance=back_tolerance,
+            top_relief=top_relief,
+            slide_relief=slide_relief,
+            back_relief=back_relief
+        )
+        drawer.compute_material()
+        parts = np.array([
+            drawer.get_drawer_box_sides(),
+            drawer.get_drawer_front_back(),
+            drawer.get_drawer_front(),
+            drawer.get_drawer_bottom()
+        ], dtype=part_dtype)
+        parts.flags.writeable = False
+        with self._lock:
+            # Another thread may have computed the same drawer meanwhile.
+            parts = self._parts.setdefault(key, parts)
+            self._parts.move_to_end(key)
+            if len(self._parts) > self.maxsize:
+                self._parts.popitem(last=False)
+
+        return parts
+
+    def cache_info(self) -> dict:
+        with self._lock:
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._parts),
+                'maxsize': self.maxsize
+            }
+
+    def clear(self):
+        with self._lock:
+            self._parts.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+drawer_cache = DrawerCache()
+
 class Cupboard(Corpus):
 
     front_edge_banding = 'u krug'
@@ -591,33 +670,33 @@ class Cupboard(Corpus):
 
     def _compute_h_dividers(self):
         if self.h_dividers:
-            self.material.extend([[
+            self.material.append(
                 'Korpus',
                 'Horizontal Dividers',
                 self.inner_width,
                 self.h_divider_depth,
                 len(self.h_dividers),
                 self.h_dividers_banding
-            ]])
-            self.material.extend([[
+            )
+            self.material.append(
                 'Korpus',
                 'Rails',
                 self.inner_width,
                 96,
                 len(self.h_dividers),
                 'jedna duza'
-            ]])
+            )
 
     def _compute_shelves(self):
         if self.shelves > 0:
-            self.material.extend([[
+            self.material.append(
                 'Korpus',
                 'Shelves',
                 self.inner_width,
                 self.shelf_depth,
                 self.shelves-self.h_dividers-1,
                 self.shelf_banding
-            ]])
+            )
 
     def _compute_drawers(self):
 
@@ -632,7 +711,7 @@ class Cupboard(Corpus):
                 slide_relief = 25
                 back_relief = 50
 
-                drawer = Drawer(
+                drawer_parts = drawer_cache.get_parts(
                     height=drawer_face_height,
                     width=self.width,
                     depth=self.depth,
@@ -643,13 +722,11 @@ class Cupboard(Corpus):
                     back_relief=back_relief
                 )
 
-                drawer.compute_material()
-                
-                self.material.extend([drawer.get_drawer_box_sides()])
-                
-                self.material.extend([drawer.get_drawer_front_back()])
-
-                self.material.extend([drawer.get_drawer_bottom()])
+                self.material.extend(drawer_parts[[
+                    DrawerCache.box_sides,
+                    DrawerCache.box_front_back,
+                    DrawerCache.bottom
+                ]])
 
     def _compute_doors(self):
         sections_total = sum(self.front_sections)
@@ -671,17 +748,17 @@ class Cupboard(Corpus):
         for heights, widths, count in zip(individual_section_heights,
                                           individual_section_widths,
                                           self.doors_per_section):
-            self.material.extend([[
+            self.material.append(
                 'Front',
                 'Door',
                 heights,
                 widths,
                 count,
                 self.front_edge_banding
-            ]])                   
+            )                   
       
     def compute_total_material(self):
-        super().compute_corpus_material()
+        super()._compute_corpus_parts()
         self._compute_h_divider_depth()
         self._compute_shelf_depth()
         self._compute_banding()
@@ -691,7 +768,7 @@ class Cupboard(Corpus):
         self._compute_drawers()
         self._compute_doors()
 
-        return pd.DataFrame.from_records(self.material)
+        return self.material.to_frame()
 
 class SectionBase:
     """Base for the whole section
@@ -717,7 +794,7 @@ class SectionBase:
         self.width = (unit_width*unit_count) + compensation
         self._base_depth = None
         self._inner_width = None
-        self.material = []
+        self.material = PartList()
 
     def _compute_base_depth(self):
         self._base_depth = self.depth - 64
@@ -727,36 +804,36 @@ class SectionBase:
 
     def _font_back(self):
 
-        self.material.append([
+        self.material.append(
             'Korpus',
             'Base, front/back', 
             self.height, 
             self.width, 
             2,
             self.front_back_banding
-        ])
+        )
 
     def _ribs(self):
 
-        self.material.append([
+        self.material.append(
             'Korpus',
             'Base, ribs', 
             self.height,
             self._inner_width, 
             self.unit_count+1,
             self.rib_banding
-        ])
+        )
     
     def _rails(self):
 
-        self.material.append([
+        self.material.append(
             'Korpus',
             'Base, rails',
             self.height,
             self._inner_width, 
             self.unit_count+1,
             'jedna_duza'
-        ])
+        )
 
     def compute_base_material(self):
         self._compute_base_depth()
@@ -765,7 +842,11 @@ class SectionBase:
         self._ribs()
         self._rails()
 
-        return pd.DataFrame.from_records(self.material)
+        return self.material.to_frame()
+
+    def get_parts(self) -> np.ndarray:
+
+        return self.material.get_records()
 
 
     
\ No newline at end of file
@@ -0,0 +1,99 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class CutList:
+    """Summary of material, updated one cabinet at a time
+
+    Parts are summarized by material, part, and dimensions, summing the
+    units and keeping the minimal banding, the same as grouping the
+    concatenated material of all cabinets. Material of single cabinets
+    is added or removed in place, so that the summary of a room or a
+    whole project is kept up to date without concatenating frames.
+
+    Material is read by position of its columns: material, part, X, Y,
+    units, and banding, regardless of the column labels.
+
+    """
+
+    key_columns = ['Materijal', 'Part', 'X', 'Y']
+    columns = key_columns + ['Units', 'Banding']
+
+    def __init__(self) -> None:
+        self._units = {}
+        self._banding = {}
+
+    def __len__(self) -> int:
+
+        return len(self._units)
+
+    def add(self, material: pd.DataFrame):
+        for material_name, part, x, y, units, banding in \
+                material.itertuples(index=False, name=None):
+            key = (material_name, part, x, y)
+            if key in self._units:
+                self._units[key] += units
+                bandings = self._banding[key]
+                bandings[banding] = bandings.get(banding, 0) + 1
+            else:
+                self._units[key] = units
+                self._banding[key] = {banding: 1}
+
+    def remove(self, material: pd.DataFrame):
+        # Counts of banding are kept, as the minimum can not be undone.
+        for material_name, part, x, y, units, banding in \
+                material.itertuples(index=False, name=None):
+            key = (material_name, part, x, y)
+            assert key in self._units, f'Part {key} not in the cut list.'
+            bandings = self._banding[key]
+            assert banding in bandings, \
+                f'Banding {banding} of part {key} not in the cut list.'
+            self._units[key] -= units
+            bandings[banding] -= 1
+            if not bandings[banding]:
+                del bandings[banding]
+            if not bandings:
+                del self._units[key]
+                del self._banding[key]
+
+    @staticmethod
+    def _min_banding(bandings: dict):
+        # Missing banding is skipped, the same as by grouping.
+        present = [
+            banding for banding in bandings
+            if banding is not None and banding == banding
+        ]
+
+        return min(present) if present else None
+
+    def iter_rows(self):
+        """Rows of the summary, sorted by material, part, and dimensions
+
+        Yields
+        ------
+        list
+            Material, part, X, Y, units, and banding.
+
+        """
+        for key in sorted(self._units):
+            yield list(key) + [
+                self._units[key], self._min_banding(self._banding[key])
+            ]
+
+    def get_summary(self) -> pd.DataFrame:
+        """Summary of material
+
+        Returns
+        -------
+        pd.DataFrame
+            Units and banding, indexed by material, part, X, and Y.
+
+        """
+        import pandas as pd
+
+        summary = pd.DataFrame(list(self.iter_rows()), columns=self.columns)
+
+        return summary.set_index(self.key_columns)
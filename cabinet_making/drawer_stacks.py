@@ -0,0 +1,195 @@
+from functools import lru_cache
+from typing import Callable
+import numpy as np
+
+
+@lru_cache(maxsize=1024)
+def _compositions(units: int,
+                  count: int,
+                  min_units: int,
+                  max_units: int) -> np.ndarray:
+    """Every split of `units` into `count` parts within the bounds
+
+    Splits of the remaining units are shared between all first parts,
+    and branches which can not be completed within the bounds are not
+    followed. Splits are cached, and therefore read-only.
+
+    Returns
+    -------
+    np.ndarray
+        One split per row.
+
+    """
+    if count == 0:
+        splits = np.zeros((1 if units == 0 else 0, 0), dtype=np.int64)
+    elif not count*min_units <= units <= count*max_units:
+        splits = np.zeros((0, count), dtype=np.int64)
+    else:
+        splits = [np.zeros((0, count), dtype=np.int64)]
+        for first in range(min_units, min(max_units, units) + 1):
+            rest = _compositions(
+                units - first, count - 1, min_units, max_units
+            )
+            if len(rest):
+                splits.append(np.column_stack([
+                    np.full(len(rest), first, dtype=np.int64), rest
+                ]))
+        splits = np.concatenate(splits)
+    splits.setflags(write=False)
+
+    return splits
+
+
+class DrawerStackSolver:
+    """Drawer fronts filling the height of a floor cabinet
+
+    Every stack of drawer fronts on the 32 mm grid, summing to the
+    height, is enumerated and ranked by its score. Fronts are listed
+    from the bottom, as for `ElevationFloorCabinet`. Slides register on
+    a system hole, or are shifted between two holes, the same as in
+    `CupboardElevation._indicate_drawers`.
+
+    The score is the sum of weighted terms, each between 0 and 1:
+
+    - `on_grid`: share of slides registering on system holes,
+    - `graduated`: 1 when no front is higher than the one below it,
+    - `even`: 1 less the spread of fronts relative to the largest one.
+
+    Parameters
+    ----------
+    height : int
+        Height of the cabinet, a multiple of 32.
+    min_drawers, max_drawers : int, optional
+        Range of drawer counts, by default from 1 to 6.
+    min_front, max_front : int, optional
+        Range of front heights, multiples of 32, by default from 96 to
+        480.
+    drawer_reference : int, optional
+        Position of the lowest drawer from the bottom, by default 0.
+    weights : dict, optional
+        Weights of score terms, by default `on_grid` and `graduated`.
+    score : Callable, optional
+        Replaces the weighted terms. Called with fronts and on grid
+        flags of all stacks of a drawer count, one stack per row, and
+        returning a score per stack.
+
+    """
+
+    pitch = 32
+    score_terms = ('on_grid', 'graduated', 'even')
+    default_weights = {'on_grid': 1, 'graduated': 1}
+
+    def __init__(self,
+                 height: int,
+                 min_drawers: int = 1,
+                 max_drawers: int = 6,
+                 min_front: int = 96,
+                 max_front: int = 480,
+                 drawer_reference: int = 0,
+                 weights: dict = None,
+                 score: Callable[[np.ndarray, np.ndarray], np.ndarray] = None
+                 ) -> None:
+        assert height % self.pitch == 0, 'Height not a multiple of 32.'
+        assert min_front % self.pitch == 0 and max_front % self.pitch == 0, \
+            'Front limits not multiples of 32.'
+        assert 0 < min_front <= max_front, 'Front limits not correct.'
+        assert 1 <= min_drawers <= max_drawers, 'Drawer counts not correct.'
+        self.height = height
+        self.min_drawers = min_drawers
+        self.max_drawers = max_drawers
+        self.min_front = min_front
+        self.max_front = max_front
+        self.drawer_reference = drawer_reference
+        self.weights = weights if weights else self.default_weights
+        for term in self.weights:
+            assert term in self.score_terms, f'Score term {term} not known.'
+        self.score = score
+
+    def _stacks(self, count: int) -> np.ndarray:
+
+        return _compositions(
+            self.height // self.pitch,
+            count,
+            self.min_front // self.pitch,
+            self.max_front // self.pitch
+        )*self.pitch
+
+    def _registrations(self, fronts: np.ndarray) -> np.ndarray:
+        # Vertical centers of fronts from the bottom.
+        centers = self.drawer_reference + np.cumsum(fronts, axis=1) \
+            - fronts/2
+
+        return centers % self.pitch == 0
+
+    @staticmethod
+    def _on_grid(fronts: np.ndarray, on_grid: np.ndarray) -> np.ndarray:
+
+        return on_grid.mean(axis=1)
+
+    @staticmethod
+    def _graduated(fronts: np.ndarray, on_grid: np.ndarray) -> np.ndarray:
+
+        return np.all(np.diff(fronts, axis=1) <= 0, axis=1).astype(float)
+
+    @staticmethod
+    def _even(fronts: np.ndarray, on_grid: np.ndarray) -> np.ndarray:
+
+        return 1 - np.ptp(fronts, axis=1)/fronts.max(axis=1)
+
+    def _score(self, fronts: np.ndarray, on_grid: np.ndarray) -> np.ndarray:
+        if self.score is not None:
+            return np.asarray(self.score(fronts, on_grid), dtype=float)
+        scores = np.zeros(len(fronts))
+        for term, weight in self.weights.items():
+            scores += weight*getattr(self, f'_{term}')(fronts, on_grid)
+
+        return scores
+
+    def count_stacks(self) -> int:
+
+        return sum(
+            len(self._stacks(count))
+            for count in range(self.min_drawers, self.max_drawers + 1)
+        )
+
+    def solve(self, top: int = 10) -> list[dict]:
+        """Best ranked drawer stacks
+
+        Parameters
+        ----------
+        top : int, optional
+            Count of stacks returned, by default 10.
+
+        Returns
+        -------
+        list[dict]
+            Fronts from the bottom, slide registrations, and score, by
+            descending score. Stacks of equal score keep fewer drawers
+            first.
+
+        """
+        candidates = []
+        for count in range(self.min_drawers, self.max_drawers + 1):
+            fronts = self._stacks(count)
+            if not len(fronts):
+                continue
+            on_grid = self._registrations(fronts)
+            scores = self._score(fronts, on_grid)
+            # Only the best of each drawer count may be among the best.
+            best = np.argsort(-scores, kind='stable')[:top]
+            candidates.extend(
+                (-scores[index], count, rank, fronts[index], on_grid[index])
+                for rank, index in enumerate(best)
+            )
+        candidates.sort(key=lambda candidate: candidate[:3])
+
+        return [
+            {
+                'drawers': fronts.tolist(),
+                'registrations': [
+                    'system reg.' if on else 'shifted reg.' for on in on_grid
+                ],
+                'score': float(-score)
+            }
+            for score, _, _, fronts, on_grid in candidates[:top]
+        ]
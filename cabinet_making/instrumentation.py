@@ -0,0 +1,208 @@
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Iterable
+
+
+class Instrumentation:
+    """Wall time per stage and counters of a single cabinet
+
+    Stages are timed with `stage`, counters are added with `count`.
+    Nested stages are named after their parent, for example
+    `elevation.write` within `elevation`, and are included in the time of
+    their parent.
+
+    Counters in use:
+
+    - `parts`, `part_units`: rows and units of the computed material,
+    - `positions_rows`: rows of the elevation table,
+    - `patches`: patches drawn by the plotter,
+    - `bytes_written`: size of written workbooks and drawings.
+
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._stages = {}
+        self._counters = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._stages[name] = \
+                self._stages.get(name, 0) + perf_counter() - start
+
+    def count(self, name: str, value: int = 1):
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def get_report(self) -> dict:
+        """Report of the cabinet
+
+        Returns
+        -------
+        dict
+            Seconds per stage, and counters.
+
+        """
+
+        return {'stages': dict(self._stages), 'counters': dict(self._counters)}
+
+
+class _DisabledInstrumentation(Instrumentation):
+
+    enabled = False
+    _stage = nullcontext()
+
+    def stage(self, name: str):
+
+        return self._stage
+
+    def count(self, name: str, value: int = 1):
+        pass
+
+    def get_report(self) -> dict:
+
+        return None
+
+
+# Default of instrumented classes, recording nothing.
+disabled = _DisabledInstrumentation()
+
+
+class AllocationProfile(Instrumentation):
+    """Instrumentation also recording allocations per stage
+
+    Allocations are traced by `tracemalloc` from creation until `stop`.
+    Per stage, the peak of memory above the memory at the start of the
+    stage, the memory retained after the stage, and the allocation
+    sites retaining most memory are recorded. Nested stages are included
+    in their parent. Tracing slows down stages several times, so that
+    seconds are not comparable to those of `Instrumentation`.
+
+    Parameters
+    ----------
+    top : int, optional
+        Count of allocation sites recorded per stage, by default 10.
+    frames : int, optional
+        Count of frames stored per allocation, by default 1. Only the
+        innermost frame names a site.
+
+    """
+
+    def __init__(self, top: int = 10, frames: int = 1) -> None:
+        super().__init__()
+        self.top = top
+        self._memory = {}
+        # Peaks of enclosing stages, as nested stages reset the peak.
+        self._peaks = []
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start(frames)
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+
+    def _top_sites(self, start: tracemalloc.Snapshot) -> list[dict]:
+        differences = self._snapshot().compare_to(start, 'lineno')
+
+        return [
+            {
+                'site': f'{difference.traceback[0].filename}:'
+                        f'{difference.traceback[0].lineno}',
+                'size': difference.size_diff,
+                'count': difference.count_diff
+            }
+            for difference in differences[:self.top]
+            if difference.size_diff > 0
+        ]
+
+    @contextmanager
+    def stage(self, name: str):
+        if self._peaks:
+            self._peaks[-1] = max(
+                self._peaks[-1], tracemalloc.get_traced_memory()[1]
+            )
+        start = self._snapshot()
+        tracemalloc.reset_peak()
+        memory = tracemalloc.get_traced_memory()[0]
+        self._peaks.append(memory)
+        try:
+            with super().stage(name):
+                yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self._peaks.pop())
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            self._memory[name] = {
+                'peak': peak - memory,
+                'retained': current - memory,
+                'top': self._top_sites(start)
+            }
+            tracemalloc.reset_peak()
+
+    def stop(self):
+        """Stop tracing, unless it was started elsewhere"""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def get_report(self) -> dict:
+        """Report of the cabinet
+
+        Returns
+        -------
+        dict
+            Seconds per stage, counters, and per stage peak and retained
+            bytes, with the sites retaining most bytes.
+
+        """
+        report = super().get_report()
+        report['memory'] = {
+            name: dict(memory) for name, memory in self._memory.items()
+        }
+
+        return report
+
+
+def merge_reports(reports: Iterable[tuple[str, dict]]) -> dict:
+    """Report of a project, out of reports of its cabinets
+
+    Parameters
+    ----------
+    reports : Iterable[tuple[str, dict]]
+        Cabinet names and their reports, skipped when None.
+
+    Returns
+    -------
+    dict
+        Reports per cabinet, and seconds per stage and counters summed
+        over all cabinets. Memory per stage, if profiled, holds the
+        largest peak and the sum of retained bytes over all cabinets.
+
+    """
+    project = {'cabinets': {}, 'stages': {}, 'counters': {}, 'memory': {}}
+    for cabinet_name, report in reports:
+        if report is None:
+            continue
+        project['cabinets'][cabinet_name] = report
+        for key in ('stages', 'counters'):
+            for name, value in report[key].items():
+                project[key][name] = project[key].get(name, 0) + value
+        for name, memory in report.get('memory', {}).items():
+            merged = project['memory'].setdefault(
+                name, {'peak': 0, 'retained': 0}
+            )
+            merged['peak'] = max(merged['peak'], memory['peak'])
+            merged['retained'] += memory['retained']
+
+    return project
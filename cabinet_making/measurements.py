@@ -1,10 +1,74 @@
-from math import ceil
+import os
 import pandas as pd
 import numpy as np
 from cabinet_making.base_classes import BaseElevation
+from cabinet_making.instrumentation import Instrumentation, disabled
+
+
+class HoleGrid:
+    """Direct index of system holes
+
+    System holes are drilled every 32 mm, starting at `offset` from the
+    top of the cabinet. Row of a position within the positions table is
+    therefore computed by arithmetic, instead of searched for.
+
+    Parameters
+    ----------
+    offset : int
+        Position of the first hole from the top.
+    count : int
+        Number of holes.
+
+    """
+
+    pitch = 32
+
+    def __init__(self, offset: int, count: int) -> None:
+        self.offset = offset
+        self.count = count
+
+    def contains(self, position: int | float) -> bool:
+        row, remainder = divmod(position - self.offset, self.pitch)
+
+        return (remainder == 0) and (0 <= row < self.count)
+
+    def from_top(self, position: int | float) -> int:
+        """Row of the position measured from the top
+
+        """
+        row, remainder = divmod(position - self.offset, self.pitch)
+
+        assert remainder == 0, \
+            f'Position {position} not on the system hole grid.'
+        assert 0 <= row < self.count, \
+            f'Position {position} outside of the system hole grid.'
+
+        return int(row)
+
+    def from_bottom(self, position: int | float) -> int:
+        """Row of the position measured from the bottom
+
+        """
+
+        return self.count - 1 - self.from_top(position)
+
 
 class CupboardElevation(BaseElevation):
 
+    rail_indices = [
+        1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1
+    ]
+    indication_columns = [
+        'hinge_indication',
+        'drawer_indication',
+        'shelf_indication',
+        'divider_indication'
+    ]
+    hinge = 0
+    drawer = 1
+    shelf = 2
+    divider = 3
+
     def __init__(self,
                  height: int,
                  sections: list[int] = [],
@@ -12,30 +76,46 @@ class CupboardElevation(BaseElevation):
                  dividers: list[int] = [],
                  drawer_reference: int = 0,
                  shelves: int = None,
-                 elevation_file: str = None) -> None:
+                 elevation_file: str = None,
+                 instrumentation: Instrumentation = disabled) -> None:
         super().__init__(height, sections, drawers, dividers, shelves)
         self.drawer_reference = drawer_reference
         self.elevation_file = elevation_file
+        self.instrumentation = instrumentation
+        self._from_top = None
+        self._from_bottom = None
+        self._indications = None
+        self._labels = None
+        self._label_codes = None
+        self._rail_takes = None
         self._positions = None
         self._section_indications = None
+        self._grid = None
 
     def _create_positions(self):
-        positions = []
-        for position in range(0, self.height, 32):
-            positions.extend([position])
-
-        # Compensation for omission of last item in `range`.
-        positions.append(self.height)
-
-        positions_table = pd.DataFrame.from_records(
-            [positions, positions[::-1]]
+        assert self.height % 32 == 0, 'Height not a multiple of 32.'
+
+        # Last position is the height itself.
+        self._from_top = np.arange(0, self.height + 1, 32, dtype=np.int32)
+        self._from_bottom = self._from_top[::-1].copy()
+        # Indications are codes into the list of labels, `0` is no label.
+        self._indications = np.zeros(
+            (len(self._from_top), len(self.indication_columns)),
+            dtype=np.int16
         )
-        self._positions = positions_table.transpose()
-        self._positions['skip_indication'] = 'USABLE'
-        self._positions['hinge_indication'] = '-'
-        self._positions['drawer_indication'] = '-'
-        self._positions['shelf_indication'] = '-'
-        self._positions['divider_indication'] = '-'
+        self._labels = ['-']
+        self._label_codes = {'-': 0}
+        self._rail_takes = None
+        self._positions = None
+        self._grid = HoleGrid(offset=0, count=len(self._from_top))
+
+    def _indicate(self, row: int, indication: int, label: str):
+        code = self._label_codes.get(label)
+        if code is None:
+            code = len(self._labels)
+            self._labels.append(label)
+            self._label_codes[label] = code
+        self._indications[row, indication] = code
 
     def _indicate_sections(self):
         # Section starts, and section ends.
@@ -69,9 +149,8 @@ class CupboardElevation(BaseElevation):
             ])
         # Make markings for system holes.
         for index, hinge_position in enumerate(hinge_positions):
-            selection = self._positions.iloc[:, 0] == hinge_position
-            self._positions.loc[selection, 'hinge_indication'] = \
-                hinge_positions_label[index]
+            row = self._grid.from_top(hinge_position)
+            self._indicate(row, self.hinge, hinge_positions_label[index])
             
     def _indicate_drawers(self):
         #top_bottom_clarence = 48
@@ -94,8 +173,8 @@ class CupboardElevation(BaseElevation):
             drawer_indices.extend([drawer_index])
             drawer_indices_labels.extend([f"Drawer slide {index}, {adjustment_indicator}"])
         for index, drawer_index in enumerate(drawer_indices):
-            selection = self._positions.iloc[:, 1] == drawer_index
-            self._positions.loc[selection, 'drawer_indication'] = drawer_indices_labels[index]
+            row = self._grid.from_bottom(drawer_index)
+            self._indicate(row, self.drawer, drawer_indices_labels[index])
 
     def _indicate_shelves(self):
         shelve_positions_label = []
@@ -110,9 +189,8 @@ class CupboardElevation(BaseElevation):
             # lengths.
             shelve_positions_label.extend([f"Shelve {index}"])
         for index, _ in enumerate(shelf_heights):  # From bottom.
-            selection = self._positions.iloc[:, 1] == shelve_positions[index]
-            self._positions.loc[selection, 'shelf_indication'] = \
-                shelve_positions_label[index] 
+            row = self._grid.from_bottom(shelve_positions[index])
+            self._indicate(row, self.shelf, shelve_positions_label[index])
             
     def _indicate_dividers(self):
         divider_label = []
@@ -121,95 +199,76 @@ class CupboardElevation(BaseElevation):
             # lengths.
             divider_label.extend([f"Divider {index}"])
         for index, divider in enumerate(self.dividers):  # From top
-            selection = self._positions.iloc[:, 0] == divider
-            self._positions.loc[selection, 'divider_indication'] = \
-                divider_label[index]
-
-    def _make_indications(self): 
+            row = self._grid.from_top(divider)
+            self._indicate(row, self.divider, divider_label[index])
+
+    def _occupied_positions(self) -> np.ndarray:
+
+        return np.any(self._indications != 0, axis=1)
+
+    def _compute_rail_takes(self, occupied: np.ndarray) -> list[tuple]:
+        """Start, end, and extension of each rail take
+
+        Every take lays the rail indices from the last occupied hole of
+        the previous take. When no further hole in reach of the rail is
+        occupied, the last hole in reach is marked as an extension, and
+        the next take starts from it.
+
+        Parameters
+        ----------
+        occupied : np.ndarray
+            Boolean indication of occupied holes, from the top.
+
+        Returns
+        -------
+        list[tuple]
+            Start index, end index, and extension indicator per take.
+
+        """
+        reach = len(self.rail_indices) - 1
+        last_hole = len(occupied) - 1
+        # Last occupied hole at, or above, each hole (-1 if none).
+        holes = np.arange(len(occupied))
+        last_occupied = np.maximum.accumulate(np.where(occupied, holes, -1))
+        takes = []
+        start = 0
+        while True:
+            end = min(start + reach, last_hole)
+            extension = last_occupied[end] <= start
+            takes.append((start, end, extension))
+            if end == last_hole:
+                break
+            start = end if extension else last_occupied[end]
+
+        return takes
+
+    def _make_indications(self):
         # Make markings for rail indications.
-        start_indices = [
-            1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1         
-        ]
-        rail_indices = [
-            1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1
-        ]
-        terminate = False
-        last_take_end_index = 0
-        take = 1
-        while terminate is not True:
-            column_name = f'rail_indices_take_{take}'
-            if take == 1:
-                indices = start_indices
-            else:
-                indices = rail_indices
-            repeats_before = np.repeat(
-                np.nan, 
-                repeats=last_take_end_index
-            ).tolist()
-            repeats = len(self._positions) - len(indices) - len(repeats_before)
-            if repeats >= 0:
-                repeats_after = np.repeat(
-                    np.nan, 
-                    repeats=(len(self._positions)-len(indices)-len(repeats_before))
-                ).tolist()
-            else:
-                truncated_indices = indices[0:len(indices)+repeats]
-                indices = truncated_indices
-                repeats_after = []
-            self._positions[column_name] = \
-                repeats_before + indices + repeats_after
-            where_are_we = self._positions.apply(
-                lambda series: series.last_valid_index()
-            )[column_name]
-            terminate = \
-                True if (where_are_we+1) == len(self._positions) else False
-            hinge_indication = self._positions['hinge_indication'] == '-'
-            slide_indication = self._positions['drawer_indication'] == '-'
-            shelve_indication = self._positions['shelf_indication'] == '-'
-            divider_indication = \
-                self._positions['divider_indication'] == '-'
-            markings = np.all([
-                hinge_indication, 
-                slide_indication, 
-                shelve_indication, 
-                divider_indication
-            ], axis=0)
-            self._positions.loc[markings, column_name] = np.nan
-            last_take_end_index_in_loop = self._positions.apply(
-                lambda series: series.last_valid_index()
-            )[column_name]
-            # Needed to avoid permanent loop.
-            if (last_take_end_index >= last_take_end_index_in_loop) or np.isnan(last_take_end_index_in_loop):
-                extension_hole = last_take_end_index+len(indices)-1  # Compensation for indexation from 0.
-                self._positions[column_name][extension_hole] = 1
-            last_take_end_index = self._positions.apply(
-                lambda series: series.last_valid_index()
-            )[column_name]
-            take += 1
-
-    def _make_rail_indications(self):
-        # Make markings for rail indications.
-        rail_indices = [
-            1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2
-        ]
-        repetitions = ceil(len(self._positions)/len(rail_indices))
-        rail_indices_across_height = repetitions * rail_indices
-        self._positions['original_rail_indices'] = \
-            rail_indices_across_height[0:len(self._positions)]       
-        self._positions['rail_indices'] = \
-            rail_indices_across_height[0:len(self._positions)]
-        hinge_indication = self._positions['hinge_indication'] == '-'
-        slide_indication = self._positions['drawer_indication'] == '-'
-        shelve_indication = self._positions['shelf_indication'] == '-'
-        divider_indication = \
-            self._positions['divider_indication'] == '-'
-        markings = np.all([
-            hinge_indication, 
-            slide_indication, 
-            shelve_indication, 
-            divider_indication
-        ], axis=0)
-        self._positions.loc[markings, 'rail_indices'] = '-x-'
+        occupied = self._occupied_positions()
+        self._rail_takes = self._compute_rail_takes(occupied=occupied)
+
+    def _make_rail_takes_table(self) -> pd.DataFrame:
+        starts, ends, extensions = \
+            (np.array(component) for component in zip(*self._rail_takes))
+        occupied_holes = np.flatnonzero(self._occupied_positions())
+        first = np.searchsorted(occupied_holes, starts, side='left')
+        last = np.searchsorted(occupied_holes, ends, side='right')
+        counts = last - first
+        take_indices = np.repeat(np.arange(len(starts)), counts)
+        offsets = np.arange(counts.sum()) \
+            - np.repeat(np.cumsum(counts) - counts, counts)
+        holes = occupied_holes[np.repeat(first, counts) + offsets]
+        rail_indices = np.array(self.rail_indices, dtype=float)
+        values = np.full((len(self._from_top), len(starts)), np.nan)
+        values[holes, take_indices] = \
+            rail_indices[holes - starts[take_indices]]
+        values[ends[extensions], np.flatnonzero(extensions)] = 1
+
+        return pd.DataFrame(
+            data=values,
+            columns=[f'rail_indices_take_{take}'
+                     for take in range(1, len(starts) + 1)]
+        )
 
     def compute_elevation(self):
         self._create_positions()
@@ -223,52 +282,113 @@ class CupboardElevation(BaseElevation):
         if self.dividers:
             self._indicate_dividers()  
         self._make_indications()
+        self.instrumentation.count('positions_rows', len(self._from_top))
     
+    def get_positions(self) -> pd.DataFrame:
+        """Labelled elevation table
+
+        The table is built from the computed positions and indications
+        on first request only.
+
+        Returns
+        -------
+        pd.DataFrame
+            Positions from the top and from the bottom, indications,
+            and rail indices per take.
+
+        """
+        if self._positions is None:
+            self._positions = self._make_positions()
+
+        return self._positions
+
+    def _make_positions(self) -> pd.DataFrame:
+        labels = np.array(self._labels, dtype=object)
+        positions = pd.DataFrame({
+            0: self._from_top.astype(np.int64),
+            1: self._from_bottom.astype(np.int64),
+            'skip_indication': 'USABLE'
+        })
+        for index, column in enumerate(self.indication_columns):
+            positions[column] = labels[self._indications[:, index]]
+
+        return pd.concat([positions, self._make_rail_takes_table()], axis=1)
+
+    def iter_rows(self):
+        """Rows of the elevation table, header first
+
+        Rows are laid out as written by `write_elevation`, with empty
+        cells as None. Unless already requested, the table is not kept,
+        so that many elevations can be streamed one after another.
+
+        Yields
+        ------
+        list
+            Index and values of a single row.
+
+        """
+        positions = self._positions
+        if positions is None:
+            positions = self._make_positions()
+        yield [None] + positions.columns.tolist()
+        for row in positions.itertuples(name=None):
+            yield [None if pd.isna(value) else value for value in row]
+
     def write_elevation(self):
-        with pd.ExcelWriter(self.elevation_file) as writer:
-            self._positions.to_excel(
-                excel_writer=writer, 
-                sheet_name='ELEVATION',             
-                merge_cells=False
+        with self.instrumentation.stage('elevation.write'):
+            with pd.ExcelWriter(self.elevation_file) as writer:
+                self.get_positions().to_excel(
+                    excel_writer=writer, 
+                    sheet_name='ELEVATION',             
+                    merge_cells=False
+                )
+        if self.instrumentation.enabled:
+            self.instrumentation.count(
+                'bytes_written', os.path.getsize(self.elevation_file)
             )
 
     def get_system_holes(self):
-        relevant_column_names = [
-            'hinge_indication',
-            'drawer_indication',
-            'shelf_indication',
-            'divider_indication'
-        ]
-        indication = self._positions.loc[:, relevant_column_names] != '-'
+        indication = self._indications != 0
         relevant_rows = np.any(indication, axis=1)
+        labels = np.array(self._labels, dtype=object)
+        
+        return {
+            "positions": self._from_bottom[relevant_rows].tolist(),
+            "labels": labels[self._indications[indication]].tolist()
+        }
+    
+    def get_hole_map(self) -> dict:
+        """Every indication of system holes, one entry per indication
 
-        occupied_positions = \
-            self._positions.loc[relevant_rows, relevant_column_names]        
+        Unlike `get_system_holes`, a hole with several indications is
+        listed once per indication, so that entries stay aligned.
 
-        summary_indication = np.array(np.argwhere(indication))
+        Returns
+        -------
+        dict
+            Positions from the bottom, indication columns, and labels,
+            as arrays of equal length.
+
+        """
+        rows, columns = np.nonzero(self._indications)
+        labels = np.array(self._labels, dtype=object)
 
-        labels = []
-        for row in range(0, len(summary_indication)):
-            current_row = summary_indication[row].tolist()
-            labels.append(
-                self._positions.iloc[current_row[0], :].loc[relevant_column_names[current_row[1]]]
-            )         
-        
         return {
-            "positions": self._positions.loc[relevant_rows, 1].tolist(),
-            "labels": labels
+            'positions': self._from_bottom[rows],
+            'indications': np.array(
+                self.indication_columns, dtype=object
+            )[columns],
+            'labels': labels[self._indications[rows, columns]]
         }
-    
+
     def get_drawers(self):
-        relevant_column_names = [
-            'drawer_indication'
-        ]
-        indication = self._positions.loc[:, relevant_column_names] != '-'
-        relevant_rows = np.any(indication, axis=1)
+        drawers = self._indications[:, self.drawer]
+        relevant_rows = drawers != 0
+        labels = np.array(self._labels, dtype=object)
         
         return {
-            'positions': self._positions.loc[relevant_rows, 1].tolist(),
-            'registration': self._positions.loc[relevant_rows, 'drawer_indication'].tolist()
+            'positions': self._from_bottom[relevant_rows].tolist(),
+            'registration': labels[drawers[relevant_rows]].tolist()
         }
 
     def get_section_indications(self):
@@ -303,6 +423,7 @@ class Elevation:
         transposed['skip_indication'] = 'USABLE'
         transposed['hinge_indication'] = 'NO HINGE'
         transposed['drawer_indication'] = 'NO SLIDE'
+        grid = HoleGrid(offset=16, count=len(positions))
 
         if self.height - 16 <= positions[-1]:
             transposed['skip_indication'].iloc[-1] = 'BLOCKED'
@@ -320,28 +441,26 @@ class Elevation:
             section = f"SECTION_{index}_"
             start = pair[0]
             end = pair[1]
-            dif_start = start - transposed.iloc[:, 0]
-            dif_end = end - transposed.iloc[:, 0]
-            start_hinge_1 = dif_start == -16
-            start_hinge_2 = dif_start == -48
-            end_hinge_1 = dif_end == 48
-            end_hinge_2 = dif_end == 16
-
-            transposed.loc[start_hinge_1, 'hinge_indication'] = \
+            start_hinge_1 = grid.from_top(start + 16)
+            start_hinge_2 = grid.from_top(start + 48)
+            end_hinge_1 = grid.from_top(end - 48)
+            end_hinge_2 = grid.from_top(end - 16)
+
+            transposed.at[start_hinge_1, 'hinge_indication'] = \
                 section + 'TOP_HINGE_1'
-            transposed.loc[start_hinge_2, 'hinge_indication'] = \
+            transposed.at[start_hinge_2, 'hinge_indication'] = \
                 section + 'TOP_HINGE_2'
-            transposed.loc[end_hinge_1, 'hinge_indication'] = \
+            transposed.at[end_hinge_1, 'hinge_indication'] = \
                 section + 'BOTTOM_HINGE_1'
-            transposed.loc[end_hinge_2, 'hinge_indication'] = \
+            transposed.at[end_hinge_2, 'hinge_indication'] = \
                 section + 'BOTTOM_HINGE_2'
             
             # Divider indication.
             dividers.extend([[
-                [transposed.loc[start_hinge_1, 1]],
-                [transposed.loc[start_hinge_2, 1]],
-                [transposed.loc[end_hinge_1, 1]],
-                [transposed.loc[end_hinge_2, 1]]    
+                [transposed.loc[[start_hinge_1], 1]],
+                [transposed.loc[[start_hinge_2], 1]],
+                [transposed.loc[[end_hinge_1], 1]],
+                [transposed.loc[[end_hinge_2], 1]]    
             ]])
 
         divs = []
@@ -357,9 +476,10 @@ class Elevation:
                 indexation = np.arange(
                     median_unit, stop=units_per_section, step=units_per_drawer
                 )
-                section_start_selection = \
-                    transposed.loc[:, 0] == cumulative_heights[index] - 16
-                indices = transposed.index[section_start_selection] + indexation
+                # Hole above the first hole of the section.
+                section_start = \
+                    grid.from_top(cumulative_heights[index] + 16) - 1
+                indices = section_start + indexation
                 transposed.loc[indices, 'drawer_indication'] = 'DRAWER_SLIDES'   
 
         return transposed
@@ -371,6 +491,7 @@ class ElevationFloorCabinet:
         self.height = height
         self.drawers = drawers
         self._positions = None
+        self._grid = None
 
     def _validate_measurements(self):
 
@@ -388,6 +509,7 @@ class ElevationFloorCabinet:
             [positions, positions[::-1]]
         )
         self._positions = positions_table.transpose()
+        self._grid = HoleGrid(offset=16, count=len(positions))
 
     def _add_positioning_column(self):
         self._positions['positioning'] = '-'
@@ -415,13 +537,12 @@ class ElevationFloorCabinet:
             #median_unit = np.median(np.arange(1, units_per_drawer+1, dtype=int))
             #indexation = pair[0] + (median_unit*32)
             indexation = int(pair[0] + (drawer/2))
-            indication = self._positions.iloc[:, 1] == indexation
-            indication_sum = np.sum(indication.astype(int))
-            if indication_sum > 0:
-                self._positions.loc[indication, 'positioning'] = f'DRAWER_{index}'
-            if indication_sum == 0:
-                indication = self._positions.iloc[:, 1] == (indexation-16)
-                self._positions.loc[indication, 'positioning'] = f'DRAWER_{index}_OFF'
+            if self._grid.contains(indexation):
+                row = self._grid.from_bottom(indexation)
+                self._positions.at[row, 'positioning'] = f'DRAWER_{index}'
+            else:
+                row = self._grid.from_bottom(indexation-16)
+                self._positions.at[row, 'positioning'] = f'DRAWER_{index}_OFF'
 
     def get_positions(self) -> pd.DataFrame:
 
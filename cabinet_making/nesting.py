@@ -0,0 +1,216 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING
+import numpy as np
+from cabinet_making.cut_list import CutList
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class SheetNesting:
+    """Guillotine layouts of the cut list on standard sheets
+
+    Parts of every material are placed onto sheets one after another,
+    largest first, so that every sheet can be cut with straight cuts
+    through from edge to edge. Free rectangles of all open sheets are
+    kept in a single list sorted by length and width, alongside an array
+    of their widths. The shortest fitting rectangle is then found by
+    bisection on length and a single vectorized comparison of widths,
+    instead of trying every position of every sheet.
+
+    Parameters
+    ----------
+    cut_list : CutList
+        Summary of material of the project.
+    sheet_length : int, optional
+        Length of sheets along the grain, by default 2800 mm.
+    sheet_width : int, optional
+        Width of sheets, by default 2070 mm.
+    kerf : int, optional
+        Width of the saw cut, by default 4 mm.
+    trim : int, optional
+        Trim of every edge of the sheet, by default 10 mm.
+    grain_materials : list[str], optional
+        Materials with parts laid with X along the length of the sheet.
+        Parts of other materials are rotated whenever it fits better.
+
+    """
+
+    placement_columns = [
+        'Materijal', 'Part', 'Sheet', 'Position X', 'Position Y', 'X', 'Y',
+        'Rotated'
+    ]
+
+    def __init__(self,
+                 cut_list: CutList = None,
+                 sheet_length: int = 2800,
+                 sheet_width: int = 2070,
+                 kerf: int = 4,
+                 trim: int = 10,
+                 grain_materials: list[str] = None) -> None:
+        self.cut_list = cut_list
+        self.sheet_length = sheet_length
+        self.sheet_width = sheet_width
+        self.kerf = kerf
+        self.trim = trim
+        self.grain_materials = grain_materials if grain_materials else []
+        self._free = None
+        self._free_widths = None
+        self._sheets = None
+        self._smallest_side = None
+        self._placements = None
+        self._nesting = None
+
+    def _parts_per_material(self) -> dict:
+        parts = {}
+        for material, part, x, y, units, _ in self.cut_list.iter_rows():
+            parts.setdefault(material, []).extend([(part, x, y)] * units)
+        for material_parts in parts.values():
+            material_parts.sort(
+                key=lambda part: (part[1]*part[2], max(part[1], part[2])),
+                reverse=True
+            )
+
+        return parts
+
+    def _insert_free(self, free: tuple):
+        index = bisect_right(self._free, free)
+        self._free.insert(index, free)
+        count = len(self._free)
+        if count > len(self._free_widths):
+            self._free_widths = np.resize(self._free_widths, 2*count)
+        self._free_widths[index + 1:count] = self._free_widths[index:count - 1]
+        self._free_widths[index] = free[1]
+
+    def _pop_free(self, index: int) -> tuple:
+        count = len(self._free)
+        self._free_widths[index:count - 1] = self._free_widths[index + 1:count]
+
+        return self._free.pop(index)
+
+    def _open_sheet(self):
+        # Kerf is added to every part, including the last one at the edge.
+        self._sheets += 1
+        self._insert_free((
+            self.sheet_length - 2*self.trim + self.kerf,
+            self.sheet_width - 2*self.trim + self.kerf,
+            self._sheets,
+            self.trim,
+            self.trim
+        ))
+
+    def _find_free(self, length: float, width: float) -> int:
+        # Shortest free rectangle of sufficient length and width, since
+        # the list is sorted by length first.
+        start = bisect_left(self._free, (length,))
+        fits = self._free_widths[start:len(self._free)] >= width
+        if fits.any():
+
+            return start + int(fits.argmax())
+
+    def _split(self, free: tuple, length: float, width: float):
+        # Split along the shorter leftover, keeping the larger rectangle.
+        free_length, free_width, sheet, x, y = free
+        if free_length - length < free_width - width:
+            rests = [
+                (free_length - length, width, sheet, x + length, y),
+                (free_length, free_width - width, sheet, x, y + width)
+            ]
+        else:
+            rests = [
+                (free_length - length, free_width, sheet, x + length, y),
+                (length, free_width - width, sheet, x, y + width)
+            ]
+        for rest in rests:
+            if min(rest[:2]) >= self._smallest_side:
+                self._insert_free(rest)
+
+    def _place(self, material: str, part: str, x: float, y: float):
+        length, width = x + self.kerf, y + self.kerf
+        index = self._find_free(length, width)
+        rotated = False
+        if material not in self.grain_materials:
+            rotated_index = self._find_free(width, length)
+            if rotated_index is not None and (
+                index is None
+                or self._free[rotated_index] < self._free[index]
+            ):
+                index, rotated = rotated_index, True
+        if index is None:
+            self._open_sheet()
+
+            return self._place(material, part, x, y)
+        free = self._pop_free(index)
+        if rotated:
+            length, width = width, length
+        self._split(free, length, width)
+        self._placements.append([
+            material,
+            part,
+            free[2],
+            free[3],
+            free[4],
+            length - self.kerf,
+            width - self.kerf,
+            rotated
+        ])
+
+    def _nest_material(self, material: str, parts: list[tuple]) -> dict:
+        usable_length = self.sheet_length - 2*self.trim
+        usable_width = self.sheet_width - 2*self.trim
+        for part, x, y in set(parts):
+            fits = x <= usable_length and y <= usable_width
+            if material not in self.grain_materials:
+                fits = fits or (y <= usable_length and x <= usable_width)
+            assert fits, f'Part {part} {x} x {y} does not fit the sheet.'
+        self._free = []
+        self._free_widths = np.empty(64)
+        self._sheets = 0
+        self._smallest_side = min(min(x, y) for _, x, y in parts) + self.kerf
+        for part, x, y in parts:
+            self._place(material, part, x, y)
+        parts_area = sum(x*y for _, x, y in parts)
+        sheets_area = self._sheets*self.sheet_length*self.sheet_width
+
+        return {
+            'sheets': self._sheets,
+            'parts': len(parts),
+            'waste': round(100*(1 - parts_area/sheets_area), 2)
+        }
+
+    def compute_nesting(self) -> dict:
+        """Nest parts of every material onto sheets
+
+        Returns
+        -------
+        dict
+            Count of sheets, count of parts, and waste in percent of the
+            area of sheets, per material.
+
+        """
+        self._placements = []
+        self._nesting = {
+            material: self._nest_material(material, parts)
+            for material, parts in self._parts_per_material().items()
+        }
+
+        return self._nesting
+
+    def get_nesting(self) -> dict:
+
+        return self._nesting
+
+    def get_placements(self) -> pd.DataFrame:
+        """Position of every part
+
+        Returns
+        -------
+        pd.DataFrame
+            Material, part, sheet, position of the corner nearest to the
+            origin of the sheet, dimensions as laid, and rotation.
+
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self._placements, columns=self.placement_columns)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import threading
+from typing import TYPE_CHECKING
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PartNames:
+    """Interned names of materials, parts, or edge banding
+
+    Every distinct name is stored once, and parts keep its code only.
+    Codes are valid within the process which interned them, and new
+    names are interned under a lock, so that threads agree on codes.
+
+    Parameters
+    ----------
+    max_codes : int
+        Number of distinct names the code type can hold.
+
+    """
+
+    def __init__(self, max_codes: int) -> None:
+        self.max_codes = max_codes
+        self._codes = {}
+        self._names = []
+        self._lock = threading.Lock()
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(name)
+                if code is None:
+                    code = len(self._names)
+                    assert code < self.max_codes, 'Too many distinct names.'
+                    self._names.append(name)
+                    self._codes[name] = code
+
+        return code
+
+    def get_names(self, codes: np.ndarray) -> np.ndarray:
+
+        return np.array(self._names, dtype=object)[codes]
+
+
+materials = PartNames(max_codes=2**8)
+part_names = PartNames(max_codes=2**16)
+bandings = PartNames(max_codes=2**8)
+
+part_dtype = np.dtype([
+    ('material', np.uint8),
+    ('part', np.uint16),
+    ('x', np.float64),
+    ('y', np.float64),
+    ('units', np.int32),
+    ('banding', np.uint8)
+])
+
+
+def make_part(material: str,
+              part: str,
+              x: float,
+              y: float,
+              units: int,
+              banding: str) -> np.void:
+    """Single part as a typed record
+
+    Returns
+    -------
+    np.void
+        Record of `part_dtype`, with codes of material, part, and banding.
+
+    """
+
+    return np.array((
+        materials.code(material),
+        part_names.code(part),
+        x,
+        y,
+        units,
+        bandings.code(banding)
+    ), dtype=part_dtype)[()]
+
+
+def to_json(value):
+    """NumPy scalars of tables of material as JSON, see `json.dumps`"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable.')
+
+
+class PartList:
+    """Growable array of parts
+
+    Parts are kept as records of `part_dtype`, 24 bytes each, instead of
+    lists of Python objects, and turned into the usual table of material
+    only once, when requested. Whether dimensions were given as floats is
+    kept per column, so that the table has the types of a table built of
+    the same values.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        Number of parts before the array grows.
+
+    """
+
+    __slots__ = ('_records', '_count', '_floats')
+
+    def __init__(self, capacity: int = 16) -> None:
+        self._records = np.zeros(capacity, dtype=part_dtype)
+        self._count = 0
+        self._floats = {'x': False, 'y': False}
+
+    def __len__(self) -> int:
+
+        return self._count
+
+    def _reserve(self, count: int):
+        if self._count + count > len(self._records):
+            records = np.zeros(
+                max(2*len(self._records), self._count + count),
+                dtype=part_dtype
+            )
+            records[:self._count] = self._records[:self._count]
+            self._records = records
+
+    def append(self,
+               material: str,
+               part: str,
+               x: float,
+               y: float,
+               units: int,
+               banding: str):
+        self._reserve(1)
+        self._records[self._count] = \
+            make_part(material, part, x, y, units, banding)
+        self._count += 1
+        self._floats['x'] |= isinstance(x, float)
+        self._floats['y'] |= isinstance(y, float)
+
+    def extend(self, parts):
+        """Add parts at the end
+
+        Parameters
+        ----------
+        parts : np.ndarray or list[np.void]
+            Records of `part_dtype`, such as made by `make_part`. Their
+            dimensions count as floats only when fractional.
+
+        """
+        parts = np.asarray(parts, dtype=part_dtype)
+        self._reserve(len(parts))
+        self._records[self._count:self._count + len(parts)] = parts
+        self._count += len(parts)
+        for column in self._floats:
+            self._floats[column] |= bool(
+                np.any(parts[column] != np.trunc(parts[column]))
+            )
+
+    def get_records(self) -> np.ndarray:
+
+        return self._records[:self._count]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Table of material
+
+        Returns
+        -------
+        pd.DataFrame
+            Material, part, X, Y, units, and banding in columns 0 to 5.
+            A column of dimensions is of floats when any of them was
+            given as a float, such as widths of doors, and of integers
+            otherwise.
+
+        """
+        import pandas as pd
+
+        records = self.get_records()
+        frame = pd.DataFrame({
+            0: materials.get_names(records['material']),
+            1: part_names.get_names(records['part']),
+            2: records['x'],
+            3: records['y'],
+            4: records['units'].astype(np.int64),
+            5: bandings.get_names(records['banding'])
+        })
+        for column, name in ((2, 'x'), (3, 'y')):
+            if not self._floats[name]:
+                frame[column] = frame[column].astype(np.int64)
+
+        return frame
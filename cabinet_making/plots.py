@@ -1,8 +1,13 @@
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as grid
+from matplotlib.figure import Figure
+from matplotlib.collections import PatchCollection
 from matplotlib.patches import Rectangle, Circle
 from cabinet_making.base_classes import BaseElevation
+from cabinet_making.cut_list import CutList
+from cabinet_making.instrumentation import Instrumentation, disabled
 
 
 class CabinetPlotter(BaseElevation):
@@ -12,6 +17,7 @@ class CabinetPlotter(BaseElevation):
     paper_width = 8.27
     horizontal_reference = .33
     coefficient = 15
+    font_size = 8
     shelve_clearance_in = None 
     panel_thickness = None
     mm_37 = None
@@ -35,7 +41,8 @@ class CabinetPlotter(BaseElevation):
                  sections: list[int] = None,
                  doors_per_section: list[int] = None,
                  section_pairs: list[int] = None,
-                 system_holes: list[int] = None) -> None:
+                 system_holes: list[int] = None,
+                 instrumentation: Instrumentation = disabled) -> None:
         super().__init__(height, sections, drawers, dividers, shelves)
         self.cabinet_type = cabinet_type
         self.orientation = orientation
@@ -66,6 +73,7 @@ class CabinetPlotter(BaseElevation):
         self.section_positions = None
         self.system_holes = system_holes
         self.section_pairs_positions = None
+        self.instrumentation = instrumentation
 
     def _set_orientation(self):
         if self.orientation == 'portrait':
@@ -179,10 +187,31 @@ class CabinetPlotter(BaseElevation):
             drawing_positions.append(drawing_position_per_pair)
         
         self.section_pairs_positions = drawing_positions
+
+    def _create_figure(self, compute_only: bool = False) -> Figure:
+        """Figure for the drawing
+
+        Drawings which are only computed are made on a `Figure` of their
+        own, outside of `pyplot`, so that no global state is shared, and
+        drawings can be made concurrently from multiple threads.
+
+        """
+        figure_size = (self.paper_width, self.paper_height)
+        if compute_only:
+            return Figure(figsize=figure_size)
+
+        return plt.figure(figsize=figure_size)
+
+    def _add_patches(self, axis, patches: list, **kwargs):
+        # Drawing coordinates are relative, limits remain from 0 to 1.
+        if patches:
+            self.instrumentation.count('patches', len(patches))
+            axis.add_collection(
+                PatchCollection(patches, match_original=True, **kwargs),
+                autolim=False
+            )
      
-    def plot_cabinet(self, 
-                     compute_only: bool = False, 
-                     plot_file: str = None) -> None:
+    def compute_drawing(self):
         self._set_orientation()
         self._basic_computations()
         self.compute_dimensions_in_inches()
@@ -191,17 +220,35 @@ class CabinetPlotter(BaseElevation):
         self.compute_reference_dimensions()
         if self.sections:
             self.compute_section_drawing_positions()
-        plt.rcParams["font.size"] = 8
+
+    def draw_cabinet(self, figure: Figure) -> None:
+        """Draw section and elevation of the cabinet
+
+        Figure is resized to the paper of the cabinet, so that a single
+        figure can be reused for drawings of multiple cabinets.
+
+        Parameters
+        ----------
+        figure : Figure
+            Empty figure to draw on.
+
+        """
+        self.compute_drawing()
         # Set figure size
-        if compute_only:
-            with plt.ioff():
-                figure = plt.figure(figsize=(self.paper_width, self.paper_height))
-        else:
-            figure = plt.figure(figsize=(self.paper_width, self.paper_height))
+        figure.set_size_inches(self.paper_width, self.paper_height)
         plotting_grid = grid.GridSpec(nrows=1, ncols=1)
         axis_1 = figure.add_subplot(plotting_grid[0, 0])
+        # Patches of the same style are drawn as a single collection.
+        outlines = []
+        front_holes = []
+        back_holes = []
+        panels = []
+        back = []
+        shelves = []
+        elevation = []
+        fronts = []
         # Box.
-        axis_1.add_patch(
+        outlines.append(
             Rectangle(
                 xy=(self.depth_from_center, self.cabinet_bottom), 
                 width=self.cabinet_relative_depth, 
@@ -215,14 +262,14 @@ class CabinetPlotter(BaseElevation):
             x = self.depth_from_center \
                 + self.cabinet_relative_depth - self.mm_37
             y = self.cabinet_bottom + self._to_unit(position)
-            axis_1.add_patch(Circle(xy=(x, y), radius=self.mm_5))
+            front_holes.append(Circle(xy=(x, y), radius=self.mm_5))
             if 'hinge' not in self.system_holes['labels'][index]:
                 x = self.depth_from_center \
                     + self.cabinet_relative_depth \
                     - self.mm_37 - (((self.depth_mm/32)-4) * self.mm_32)  # 64 mm from the back.
-                axis_1.add_patch(Circle(xy=(x, y), radius=self.mm_5, fc='orange'))
+                back_holes.append(Circle(xy=(x, y), radius=self.mm_5, fc='orange'))
         # Bottom.
-        axis_1.add_patch(
+        panels.append(
             Rectangle(
                 xy=(self.depth_from_center, self.cabinet_bottom),
                 width=self.cabinet_relative_depth,
@@ -232,7 +279,7 @@ class CabinetPlotter(BaseElevation):
             )
         )
         # Bottom nailer.
-        axis_1.add_patch(
+        panels.append(
             Rectangle(
                 xy=(
                     self.depth_from_center + self.mm_6,
@@ -246,7 +293,7 @@ class CabinetPlotter(BaseElevation):
         )
         # Top.
         if (self.cabinet_type == 'wall') or (self.cabinet_type == 'cupboard'):
-            axis_1.add_patch(
+            panels.append(
                 Rectangle(
                     xy=(
                         self.depth_from_center, 
@@ -259,7 +306,7 @@ class CabinetPlotter(BaseElevation):
                 )
             )
         if self.cabinet_type == 'floor':
-            axis_1.add_patch(
+            panels.append(
                 Rectangle(
                     xy=(
                         self.depth_from_center, 
@@ -271,7 +318,7 @@ class CabinetPlotter(BaseElevation):
                     hatch='/////'
                 )
             )
-            axis_1.add_patch(
+            panels.append(
                 Rectangle(
                     xy=(
                         self.depth_from_center+(self.cabinet_relative_depth)-self.rail, 
@@ -284,7 +331,7 @@ class CabinetPlotter(BaseElevation):
                 )
             )
         # Top nailer.
-        axis_1.add_patch(
+        panels.append(
             Rectangle(
                 xy=(
                     self.depth_from_center + self.mm_6,
@@ -301,7 +348,7 @@ class CabinetPlotter(BaseElevation):
             )
         )
         # Back.
-        axis_1.add_patch(Rectangle(
+        back.append(Rectangle(
             xy=(
                 self.depth_from_center + self.mm_3, 
                 self.cabinet_bottom + self.mm_6
@@ -312,7 +359,7 @@ class CabinetPlotter(BaseElevation):
             facecolor='k'
         ))
         # Empty between the back and the wall.
-        axis_1.add_patch(Rectangle(
+        back.append(Rectangle(
             xy=(
                 self.depth_from_center, 
                 self.cabinet_bottom + self.mm_6
@@ -327,14 +374,14 @@ class CabinetPlotter(BaseElevation):
         if self.dividers_in:
             for divider in self.dividers_in:
                 x, y = self._compute_drawing_position(divider)
-                axis_1.add_patch(Rectangle(
+                panels.append(Rectangle(
                     xy=(y+self.mm_6, 1-x), 
                     width=self.cabinet_relative_depth - self.mm_6, 
                     height=self.panel_thickness, 
                     fill=False,
                     hatch='/////'
                 ))      
-                axis_1.add_patch(
+                panels.append(
                     Rectangle(
                         xy=(
                             y + self.mm_6,
@@ -350,13 +397,12 @@ class CabinetPlotter(BaseElevation):
         if self.shelves:
             for shelve in self.shelves_in_inch:
                 x, y = self._compute_drawing_position(shelve)
-                axis_1.add_patch(Rectangle(
+                shelves.append(Rectangle(
                     xy=(y+self.mm_6, x), 
                     width=self.cabinet_relative_depth - self.shelve_clearance_in, 
                     height=self.panel_thickness, 
                     fill=False,
-                    linestyle='--',
-                    zorder=0
+                    linestyle='--'
                 ))
         # Drawers.
         if len(self.drawers['positions']) > 0:
@@ -368,7 +414,7 @@ class CabinetPlotter(BaseElevation):
                 if 'shifted' in self.drawers['registration'][::-1][index]:
                     compensation = self.mm_32 * .5
                 # Box.
-                axis_1.add_patch(Rectangle(
+                outlines.append(Rectangle(
                     xy=(
                         y + (10*self.mm_5), 
                         x - (drawer_box*.5) - compensation
@@ -378,7 +424,7 @@ class CabinetPlotter(BaseElevation):
                     fill=False
                 ))
                 # Drawer rail.
-                axis_1.add_patch(Rectangle(
+                panels.append(Rectangle(
                     xy=(
                         self.horizontal_reference + (self.cabinet_relative_depth/2) - self.rail, 
                         x - (drawer_box*.5) - compensation - (self.mm_32)
@@ -391,7 +437,7 @@ class CabinetPlotter(BaseElevation):
         # Elevation, box.
         horizontal_offset = \
             1 - self.horizontal_reference - (self.cabinet_relative_width/2)
-        axis_1.add_patch(
+        elevation.append(
             Rectangle(
                 xy=(horizontal_offset, self.cabinet_bottom), 
                 width=self.cabinet_relative_width, 
@@ -417,7 +463,7 @@ class CabinetPlotter(BaseElevation):
                         door_compensation = 0
                         if door > 0:
                             door_compensation = self.mm_3
-                        axis_1.add_patch(
+                        fronts.append(
                             Rectangle(
                                 xy=(
                                     horizontal_offset + (self.mm_3*.5) + door*width + door_compensation, 
@@ -435,7 +481,7 @@ class CabinetPlotter(BaseElevation):
         if self.drawers_in:
             for index, drawer in enumerate(self.drawers_in[::-1]):
                 x, y = self._compute_drawing_position(drawer)
-                axis_1.add_patch(
+                fronts.append(
                     Rectangle(
                         xy=(
                             horizontal_offset+(self.mm_3*.5), 
@@ -449,34 +495,25 @@ class CabinetPlotter(BaseElevation):
                         facecolor='lightgray',
                     )
                 )
+        # Order of collections keeps the original overlap of patches.
+        self._add_patches(axis_1, outlines)
+        self._add_patches(axis_1, front_holes)
+        self._add_patches(axis_1, back_holes)
+        self._add_patches(axis_1, panels, hatch='/////')
+        self._add_patches(axis_1, back)
+        self._add_patches(axis_1, shelves, zorder=0)
+        self._add_patches(axis_1, elevation)
+        self._add_patches(axis_1, fronts)
         # Tabulation of material.
         if self.material is not None:
-            content = self.material
-            content.columns = [
-                'Materijal', 
-                'Part', 
-                'X', 
-                'Y', 
-                'Units', 
-                'Banding'
+            cut_list = CutList()
+            cut_list.add(self.material)
+            cell_text = [
+                [part, int(x), int(y)]
+                for _, part, x, y, _, _ in cut_list.iter_rows()
             ]
-            summary = content.groupby(by=[
-                'Materijal', 
-                'Part', 
-                'X', 
-                'Y'
-            ]).aggregate({
-                'Units': sum,
-                'Banding': min
-            })
-            flat_index = pd.DataFrame.from_records(summary.index.to_flat_index())          
-            final = pd.concat(
-                [flat_index, pd.DataFrame(summary.values)], 
-                axis=1
-            )
-            final_correct_type = final.astype({2: int, 3: int})
             table = axis_1.table(
-                cellText=final_correct_type.iloc[:, 1:4].values,
+                cellText=cell_text,
                 loc=17,
                 rasterized=True
             )
@@ -497,12 +534,27 @@ class CabinetPlotter(BaseElevation):
         axis_1.tick_params(labeltop=True, labelright=True)
         axis_1.tick_params(axis='both', direction='in')
         axis_1.tick_params(bottom=True, top=True, left=True, right=True) 
+        axis_1.tick_params(labelsize=self.font_size)
         axis_1.set_xticklabels([])
         axis_1.set_yticklabels([])
         #figure.subplots_adjust(left=.25, right=.75)
-        plt.tight_layout()
-        plt.savefig(fname=plot_file, dpi=1200, format='pdf')
-        plt.close('all')
+        figure.tight_layout()
+
+    def plot_cabinet(self, 
+                     compute_only: bool = False, 
+                     plot_file: str = None) -> None:
+        self._set_orientation()
+        figure = self._create_figure(compute_only=compute_only)
+        with self.instrumentation.stage('plot.draw'):
+            self.draw_cabinet(figure=figure)
+        with self.instrumentation.stage('plot.save'):
+            figure.savefig(fname=plot_file, dpi=1200, format='pdf')
+        if self.instrumentation.enabled:
+            self.instrumentation.count(
+                'bytes_written', os.path.getsize(plot_file)
+            )
+        if not compute_only:
+            plt.close(figure)
 
 
 class SectionPlotter:
@@ -511,6 +563,7 @@ class SectionPlotter:
     paper_width = 11.69
     horizontal_reference = .1
     coefficient = 15
+    font_size = 8
     shelve_clearance_in = 12 / inch_in_mm / coefficient / paper_height 
     panel_thickness = 18 / inch_in_mm / coefficient / paper_height
     mm_37 = 37 / inch_in_mm / coefficient / paper_height
@@ -525,10 +578,23 @@ class SectionPlotter:
         self.wall_section = []
         self.floor_section = []
 
-    def _plot_section(self):
-        plt.rcParams["font.size"] = 8
+    def draw_section(self, figure: Figure) -> None:
+        """Draw elevation of the whole section
+
+        Cabinets of the section must be drawn beforehand, since their
+        drawing dimensions are reused.
+
+        Parameters
+        ----------
+        figure : Figure
+            Empty figure to draw on.
+
+        """
+        self.wall_section = []
+        self.floor_section = []
+        self._reorder_plots()
         # Set figure size
-        figure = plt.figure(figsize=(self.paper_width, self.paper_height))
+        figure.set_size_inches(self.paper_width, self.paper_height)
         plotting_grid = grid.GridSpec(nrows=1, ncols=1)
         axis_1 = figure.add_subplot(plotting_grid[0, 0])
         # Elevation, box.
@@ -625,11 +691,23 @@ class SectionPlotter:
         axis_1.tick_params(labeltop=True, labelright=True)
         axis_1.tick_params(axis='both', direction='in')
         axis_1.tick_params(bottom=True, top=True, left=True, right=True) 
+        axis_1.tick_params(labelsize=self.font_size)
         axis_1.set_xticklabels([])
         axis_1.set_yticklabels([])
-        plt.tight_layout()
-        plt.savefig(fname='cabinet.pdf', dpi=1200, format='pdf')
-        plt.show()
+        figure.tight_layout()
+
+    def _plot_section(self,
+                      compute_only: bool = False,
+                      plot_file: str = 'cabinet.pdf'):
+        figure_size = (self.paper_width, self.paper_height)
+        if compute_only:
+            figure = Figure(figsize=figure_size)
+        else:
+            figure = plt.figure(figsize=figure_size)
+        self.draw_section(figure=figure)
+        figure.savefig(fname=plot_file, dpi=1200, format='pdf')
+        if not compute_only:
+            plt.show()
 
     def _reorder_plots(self):
         for cabinet_plot in self.section:
@@ -641,9 +719,10 @@ class SectionPlotter:
                 case 'cupboard':
                     self.floor_section.append(cabinet_plot)
 
-    def plot_section(self):
-        self._reorder_plots()
-        self._plot_section()
+    def plot_section(self,
+                     compute_only: bool = False,
+                     plot_file: str = 'cabinet.pdf'):
+        self._plot_section(compute_only=compute_only, plot_file=plot_file)
 
             # Sections.
             # for index, section_pair in enumerate(cabinet.section_pairs_positions):
@@ -0,0 +1,116 @@
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from cabinet_making.cabinet_maker import CabinetMaker
+from cabinet_making.plots import SectionPlotter
+
+
+class ProjectBook:
+    """Drawings of the whole project within a single document
+
+    Index, cabinets, and room sections are drawn one after another on a
+    single figure, and written as pages of a single PDF file. Figure,
+    fonts, and the file are therefore set up only once per project.
+
+    Parameters
+    ----------
+    book_file : str
+        Path of the PDF file.
+    cabinets : list[CabinetMaker]
+        Cabinets of the project, one page per cabinet. Cabinets which
+        are not made yet, are made without writing their own drawing
+        and elevation.
+    sections : list[list[CabinetMaker]], optional
+        Cabinets of each room section, one page per section.
+    title : str, optional
+        Title of the index page.
+    dpi : int, optional
+        Resolution of rasterized parts of drawings, such as the table of
+        material, by default as for drawings of single cabinets.
+
+    """
+
+    paper_height = 11.69
+    paper_width = 8.27
+    font_size = 10
+
+    def __init__(self,
+                 book_file: str = None,
+                 cabinets: list[CabinetMaker] = None,
+                 sections: list[list[CabinetMaker]] = None,
+                 title: str = None,
+                 dpi: int = 1200) -> None:
+        self.book_file = book_file
+        self.cabinets = cabinets
+        self.sections = sections if sections else []
+        self.title = title
+        self.dpi = dpi
+        self._section_plotters = None
+
+    def _prepare_cabinets(self):
+        section_cabinets = [
+            cabinet for section in self.sections for cabinet in section
+        ]
+        for cabinet in self.cabinets + section_cabinets:
+            if cabinet.cabinet is None:
+                cabinet.make_cabinet(plot=False, write_elevation=False)
+        self._section_plotters = [
+            SectionPlotter(
+                section=[cabinet.get_plotter() for cabinet in section]
+            )
+            for section in self.sections
+        ]
+
+    def _index_rows(self) -> list[list]:
+        rows = []
+        page = 2  # Index is the first page.
+        for cabinet in self.cabinets:
+            rows.append([
+                page,
+                cabinet.cabinet_name,
+                cabinet.cabinet_type,
+                f'{cabinet.height_mm} x {cabinet.width_mm} x {cabinet.depth_mm}'
+            ])
+            page += 1
+        for index, section in enumerate(self.sections):
+            rows.append([
+                page,
+                f'Section {index}',
+                'section',
+                ', '.join(str(cabinet.cabinet_name) for cabinet in section)
+            ])
+            page += 1
+
+        return rows
+
+    def draw_index(self, figure: Figure) -> None:
+        figure.set_size_inches(self.paper_width, self.paper_height)
+        axis_1 = figure.add_subplot()
+        axis_1.set_axis_off()
+        if self.title:
+            axis_1.set_title(self.title, fontsize=self.font_size*1.5)
+        table = axis_1.table(
+            cellText=self._index_rows(),
+            colLabels=['Page', 'Cabinet', 'Type', 'Height x width x depth'],
+            loc='upper center',
+            cellLoc='left'
+        )
+        table.auto_set_font_size(False)
+        table.set_fontsize(self.font_size)
+        table.auto_set_column_width(col=[0, 1, 2, 3])
+
+    def plot_book(self):
+        self._prepare_cabinets()
+        figure = Figure(figsize=(self.paper_width, self.paper_height))
+        with PdfPages(self.book_file) as book:
+            self.draw_index(figure=figure)
+            book.savefig(figure, dpi=self.dpi)
+            for cabinet in self.cabinets:
+                figure.clear()
+                cabinet.get_plotter().draw_cabinet(figure=figure)
+                book.savefig(figure, dpi=self.dpi)
+            for section_plotter in self._section_plotters:
+                for plotter in section_plotter.section:
+                    plotter.compute_drawing()
+                figure.clear()
+                section_plotter.draw_section(figure=figure)
+                book.savefig(figure, dpi=self.dpi)
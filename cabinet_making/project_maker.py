@@ -0,0 +1,246 @@
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from threading import Event
+from typing import Callable
+from cabinet_making.build_cache import BuildCache
+from cabinet_making.cabinet_maker import CabinetMaker
+from cabinet_making.instrumentation import (
+    AllocationProfile, Instrumentation, disabled, merge_reports
+)
+
+
+def _make_cabinet(spec: dict,
+                  stages: tuple[str] = None,
+                  cache_dir: str = None,
+                  instrument: bool = False,
+                  profile_memory: bool = False) -> dict:
+    """Make a single cabinet within a worker process
+
+    Any error is caught and returned, so that a failing cabinet does
+    not affect the remaining cabinets of the project.
+
+    Parameters
+    ----------
+    spec : dict
+        Keyword arguments of `CabinetMaker`.
+    stages : tuple[str], optional
+        Stages to run, see `ProjectMaker`, by default all of them.
+    cache_dir : str, optional
+        Directory of the `BuildCache`, by default no cache.
+    instrument : bool, optional
+        Record seconds per stage and counters, by default False.
+    profile_memory : bool, optional
+        Also record allocations per stage, see `AllocationProfile`, by
+        default False.
+
+    Returns
+    -------
+    dict
+        Cabinet name, status, error, computed material, stages skipped
+        by the cache, and report of the instrumentation.
+
+    """
+    stages = stages if stages else ProjectMaker.stages
+    if profile_memory:
+        instrumentation = AllocationProfile()
+    elif instrument:
+        instrumentation = Instrumentation()
+    else:
+        instrumentation = disabled
+    try:
+        if cache_dir:
+            made = BuildCache(cache_dir=cache_dir).make_cabinet(
+                spec, stages, instrumentation=instrumentation
+            )
+            material, cached = made['material'], made['cached']
+        else:
+            cabinet_maker = CabinetMaker(
+                **spec, instrumentation=instrumentation
+            )
+            # Drawings tabulate the material.
+            cabinet_maker.make_cabinet(
+                plot='plot' in stages,
+                write_elevation='elevation' in stages,
+                material='material' in stages or 'plot' in stages,
+                elevation=False
+            )
+            material = cabinet_maker.measurements \
+                if 'material' in stages else None
+            cached = []
+    except Exception as error:
+
+        return {
+            'cabinet_name': spec.get('cabinet_name'),
+            'status': 'failed',
+            'error': ''.join(traceback.format_exception(error)),
+            'material': None,
+            'cached': [],
+            'report': instrumentation.get_report()
+        }
+    finally:
+        if profile_memory:
+            instrumentation.stop()
+
+    return {
+        'cabinet_name': spec.get('cabinet_name'),
+        'status': 'done',
+        'error': None,
+        'material': material,
+        'cached': cached,
+        'report': instrumentation.get_report()
+    }
+
+
+class ProjectMaker:
+    """Cabinets of a project made in parallel
+
+    Every cabinet is made by `CabinetMaker` within a pool of worker
+    processes. Results are returned in the order of the cabinets,
+    regardless of the order of completion.
+
+    Parameters
+    ----------
+    cabinets : list[dict]
+        Keyword arguments of `CabinetMaker`, one per cabinet.
+    max_workers : int, optional
+        Number of worker processes, by default number of processors.
+    progress : Callable, optional
+        Called with count of finished cabinets, count of all cabinets,
+        and the result, each time a cabinet is finished.
+    mp_context : optional
+        Multiprocessing context of the worker processes.
+    stages : tuple[str], optional
+        Stages to run for every cabinet, out of `material` (computed
+        material), `elevation` (elevation workbook), and `plot`
+        (drawing), by default all of them. Drawings compute the
+        material and the elevation they show, without writing them.
+    cache_dir : str, optional
+        Directory of the `BuildCache`, skipping stages of cabinets which
+        did not change, by default no cache.
+    instrument : bool, optional
+        Record seconds per stage and counters of every cabinet, see
+        `get_report`, by default False.
+    profile_memory : bool, optional
+        Also record peak and retained memory per stage, with the sites
+        retaining most memory, see `AllocationProfile`, by default False.
+
+    """
+
+    stages = ('material', 'elevation', 'plot')
+
+    def __init__(self,
+                 cabinets: list[dict] = None,
+                 max_workers: int = None,
+                 progress: Callable[[int, int, dict], None] = None,
+                 mp_context=None,
+                 stages: tuple[str] = None,
+                 cache_dir: str = None,
+                 instrument: bool = False,
+                 profile_memory: bool = False) -> None:
+        self.cabinets = cabinets
+        self.max_workers = max_workers
+        self.progress = progress
+        self.mp_context = mp_context
+        self.cache_dir = cache_dir
+        self.instrument = instrument
+        self.profile_memory = profile_memory
+        if stages:
+            for stage in stages:
+                assert stage in self.stages, f'Stage {stage} not known.'
+            self.stages = tuple(stages)
+        self._cancelled = Event()
+        self._results = None
+
+    def cancel(self):
+        """Stop submitting cabinets
+
+        Cabinets already being made are finished, the remaining ones
+        are reported as cancelled. Safe to call from `progress`, or from
+        another thread.
+
+        """
+        self._cancelled.set()
+
+    def _collect(self, spec: dict, future) -> dict:
+        if future.cancelled():
+            return {
+                'cabinet_name': spec.get('cabinet_name'),
+                'status': 'cancelled',
+                'error': None,
+                'material': None,
+                'cached': [],
+                'report': None
+            }
+        try:
+            result = future.result()
+        except BrokenProcessPool as error:
+            result = {
+                'cabinet_name': spec.get('cabinet_name'),
+                'status': 'failed',
+                'error': ''.join(traceback.format_exception(error)),
+                'material': None,
+                'cached': [],
+                'report': None
+            }
+
+        return result
+
+    def make_project(self) -> list[dict]:
+        self._cancelled.clear()
+        total = len(self.cabinets)
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self.mp_context
+        )
+        try:
+            futures = [
+                executor.submit(
+                    _make_cabinet,
+                    spec,
+                    self.stages,
+                    self.cache_dir,
+                    self.instrument,
+                    self.profile_memory
+                )
+                for spec in self.cabinets
+            ]
+            indices = {future: index for index, future in enumerate(futures)}
+            for finished, future in enumerate(as_completed(futures), 1):
+                if self._cancelled.is_set():
+                    break
+                if self.progress:
+                    index = indices[future]
+                    self.progress(
+                        finished,
+                        total,
+                        self._collect(self.cabinets[index], future)
+                    )
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._results = [
+            self._collect(spec, future)
+            for spec, future in zip(self.cabinets, futures)
+        ]
+
+        return self._results
+
+    def get_results(self) -> list[dict]:
+
+        return self._results
+
+    def get_report(self) -> dict:
+        """Seconds per stage and counters of the made project
+
+        Returns
+        -------
+        dict
+            Reports per cabinet, and their sums, see `merge_reports`.
+            Empty unless made with `instrument` or `profile_memory`.
+
+        """
+
+        return merge_reports(
+            (result['cabinet_name'], result['report'])
+            for result in self._results
+        )
@@ -0,0 +1,122 @@
+import json
+from pathlib import Path
+
+
+class ProjectSpec:
+    """Rooms, sections, and cabinets of a project, read from a spec file
+
+    JSON and YAML specs hold a project with rooms, each with sections of
+    cabinets::
+
+        {
+            "project": "Apartment",
+            "rooms": [{
+                "room": "Kitchen",
+                "sections": [{
+                    "section": "Bottom",
+                    "cabinets": [{"cabinet_name": "sink", ...}]
+                }]
+            }]
+        }
+
+    Cabinets may also be listed under a top-level `cabinets` key. JSONL
+    specs hold a single cabinet per line. Every cabinet holds keyword
+    arguments of `CabinetMaker`, and optionally `room` and `section`.
+
+    Parameters
+    ----------
+    spec_file : str, optional
+        Path of a `.json`, `.jsonl`, `.yaml`, or `.yml` file.
+    spec : dict, optional
+        Already parsed spec, instead of a file.
+
+    """
+
+    location_keys = ('room', 'section')
+
+    def __init__(self, spec_file: str = None, spec: dict = None) -> None:
+        self.spec_file = spec_file
+        self.spec = spec
+        self._cabinets = None
+
+    def _read_file(self) -> dict:
+        spec_file = Path(self.spec_file)
+        match spec_file.suffix:
+            case '.json':
+                with open(spec_file) as file:
+                    return json.load(file)
+            case '.jsonl':
+                with open(spec_file) as file:
+                    return {
+                        'cabinets': [
+                            json.loads(line) for line in file if line.strip()
+                        ]
+                    }
+            case '.yaml' | '.yml':
+                # Optional dependency, needed for YAML specs only.
+                import yaml
+
+                with open(spec_file) as file:
+                    return yaml.safe_load(file)
+        raise ValueError(f'Spec file {spec_file} not JSON, JSONL, or YAML.')
+
+    def _flatten(self) -> list[dict]:
+        cabinets = [dict(cabinet) for cabinet in self.spec.get('cabinets', [])]
+        for room in self.spec.get('rooms', []):
+            for section in room.get('sections', []):
+                for cabinet in section.get('cabinets', []):
+                    cabinets.append({
+                        'room': room.get('room'),
+                        'section': section.get('section'),
+                        **cabinet
+                    })
+
+        return cabinets
+
+    def _validate_cabinets(self):
+        names = set()
+        for cabinet in self._cabinets:
+            name = cabinet.get('cabinet_name')
+            assert name, 'Cabinet without a name.'
+            # Files of the cabinet are named after it.
+            assert name not in names, f'Cabinet {name} not unique.'
+            names.add(name)
+
+    def read_spec(self) -> list[dict]:
+        """Cabinets of the project
+
+        Returns
+        -------
+        list[dict]
+            Cabinets in the order of the spec, with their room and
+            section, if any.
+
+        """
+        if self.spec is None:
+            self.spec = self._read_file()
+        self._cabinets = self._flatten()
+        self._validate_cabinets()
+
+        return self._cabinets
+
+    def get_cabinets(self) -> list[dict]:
+
+        return self._cabinets
+
+    def get_maker_specs(self) -> list[dict]:
+        """Keyword arguments of `CabinetMaker`, without room and section
+
+        Returns
+        -------
+        list[dict]
+            One per cabinet, in the order of the spec.
+
+        """
+
+        return [
+            {
+                key: value for key, value in cabinet.items()
+                if key not in self.location_keys
+            }
+            for cabinet in self._cabinets
+        ]
@@ -0,0 +1,357 @@
+"""Persistent store of computed material and hole maps
+
+Usage::
+
+    python -m cabinet_making.result_store stats
+    python -m cabinet_making.result_store clear
+
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import TYPE_CHECKING
+from cabinet_making.build_cache import library_version
+from cabinet_making.cabinet_maker import CabinetMaker
+from cabinet_making.parts import to_json
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class ResultStore:
+    """Material, system holes, and drawers of cabinets, kept in SQLite
+
+    Results are keyed on a hash of the keyword arguments which change
+    the material or the hole map, see `key_fields`, and the version of
+    the library, so that a cabinet repeating across jobs, under any name
+    or orientation, is computed once. Name and orientation of the
+    cabinet which stored a result are kept as metadata. The database is
+    opened in WAL mode, so that worker processes read while another one
+    writes, and every process opens its own connection. Lookups do not
+    take the write lock: their last use and counts of hits and misses
+    are written in batches, see `usage_batch`. Least recently used
+    results are evicted once the stored results exceed `max_bytes`.
+
+    Parameters
+    ----------
+    store_file : str, optional
+        Path of the SQLite database.
+    max_bytes : int, optional
+        Size of stored results before eviction, by default 256 MiB.
+    timeout : float, optional
+        Seconds to wait for a lock held by another process, by default
+        30.
+
+    """
+
+    # Eviction leaves room, so that it does not run on every write.
+    eviction_fill = .9
+    # Lookups of a process before their usage is written.
+    usage_batch = 64
+    # Keyword arguments of `CabinetMaker` keyed on, with their defaults.
+    key_fields = {
+        'cabinet_type': 'floor',
+        'height': None,
+        'depth': None,
+        'width': None,
+        'dividers': None,
+        'shelves': None,
+        'drawers': None,
+        'drawer_reference': 0,
+        'drawer_front': None,
+        'sections': None,
+        'doors_per_section': None
+    }
+    # Results of another schema are dropped on connecting.
+    schema_version = 1
+    schema = [
+        """CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            cabinet_name TEXT,
+            orientation TEXT,
+            material TEXT NOT NULL,
+            holes TEXT NOT NULL,
+            drawers TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            last_used REAL NOT NULL
+        )""",
+        """CREATE INDEX IF NOT EXISTS results_last_used
+            ON results (last_used)""",
+        """CREATE TABLE IF NOT EXISTS stats (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )"""
+    ]
+
+    def __init__(self,
+                 store_file: str = '.cabinet_results.sqlite',
+                 max_bytes: int = 256*2**20,
+                 timeout: float = 30) -> None:
+        self.store_file = store_file
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._connection = None
+        self._pid = None
+        self._usage = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are not shared with forked worker processes.
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.store_file, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                version, = connection.execute(
+                    'PRAGMA user_version'
+                ).fetchone()
+                if version != self.schema_version:
+                    connection.execute('DROP TABLE IF EXISTS results')
+                    connection.execute(
+                        f'PRAGMA user_version = {self.schema_version}'
+                    )
+                for statement in self.schema:
+                    connection.execute(statement)
+            self._connection = connection
+            self._pid = os.getpid()
+            # Usage of a parent process is written by the parent.
+            self._usage = {'hits': 0, 'misses': 0, 'last_used': {}}
+
+        return self._connection
+
+    def _key(self, spec: dict) -> str:
+        fields = {
+            field: spec.get(field, default)
+            for field, default in self.key_fields.items()
+        }
+        canonical = json.dumps(
+            {'spec': fields, 'version': library_version()},
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        )
+
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _write_usage(self, connection: sqlite3.Connection):
+        """Write pending usage, within a write transaction"""
+        usage = self._usage
+        connection.executemany(
+            'UPDATE results SET last_used = MAX(last_used, ?) WHERE key = ?',
+            [(used, key) for key, used in usage['last_used'].items()]
+        )
+        connection.executemany(
+            'INSERT INTO stats (name, value) VALUES (?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET value = value + excluded.value',
+            [(name, usage[name]) for name in ('hits', 'misses')
+             if usage[name]]
+        )
+        self._usage = {'hits': 0, 'misses': 0, 'last_used': {}}
+
+    def _flush_usage(self):
+        connection = self._connect()
+        usage = self._usage
+        if not (usage['hits'] or usage['misses']):
+            return
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            self._write_usage(connection)
+
+    def get(self, spec: dict) -> dict:
+        """Stored result of a cabinet
+
+        Parameters
+        ----------
+        spec : dict
+            Keyword arguments of `CabinetMaker`.
+
+        Returns
+        -------
+        dict
+            Material, system holes, and drawers, None if not stored.
+
+        """
+        import pandas as pd
+
+        connection = self._connect()
+        key = self._key(spec)
+        # Read without a lock, readers do not wait for a writer in WAL mode.
+        row = connection.execute(
+            'SELECT material, holes, drawers FROM results WHERE key = ?',
+            (key,)
+        ).fetchone()
+        if row is None:
+            self._usage['misses'] += 1
+        else:
+            self._usage['hits'] += 1
+            self._usage['last_used'][key] = time.time()
+        if self._usage['hits'] + self._usage['misses'] >= self.usage_batch:
+            self._flush_usage()
+        if row is None:
+            return None
+        material, holes, drawers = row
+
+        return {
+            'material': pd.DataFrame(json.loads(material)),
+            'holes': json.loads(holes),
+            'drawers': json.loads(drawers)
+        }
+
+    def _evict(self, connection: sqlite3.Connection):
+        total, = connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        kept = 0
+        evicted = []
+        for key, size in connection.execute(
+            'SELECT key, size FROM results ORDER BY last_used DESC'
+        ).fetchall():
+            kept += size
+            if kept > self.max_bytes*self.eviction_fill:
+                evicted.append((key,))
+        connection.executemany('DELETE FROM results WHERE key = ?', evicted)
+        connection.execute(
+            'INSERT INTO stats (name, value) VALUES (\'evictions\', ?) '
+            'ON CONFLICT (name) DO UPDATE SET value = value + excluded.value',
+            (len(evicted),)
+        )
+
+    def put(self, spec: dict, result: dict):
+        """Store the result of a cabinet
+
+        Parameters
+        ----------
+        spec : dict
+            Keyword arguments of `CabinetMaker`.
+        result : dict
+            Material, system holes, and drawers, as returned by `get`.
+
+        """
+        material = json.dumps(
+            result['material'].values.tolist(), default=to_json
+        )
+        holes = json.dumps(result['holes'])
+        drawers = json.dumps(result['drawers'])
+        now = time.time()
+        connection = self._connect()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'INSERT OR REPLACE INTO results '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    self._key(spec),
+                    spec.get('cabinet_name'),
+                    spec.get('orientation', 'portrait'),
+                    material,
+                    holes,
+                    drawers,
+                    len(material) + len(holes) + len(drawers),
+                    now,
+                    now
+                )
+            )
+            self._write_usage(connection)
+            self._evict(connection)
+
+    def compute_cabinet(self, spec: dict) -> dict:
+        """Result of a cabinet, computed unless stored
+
+        Parameters
+        ----------
+        spec : dict
+            Keyword arguments of `CabinetMaker`.
+
+        Returns
+        -------
+        dict
+            Material, as computed by `compute_total_material`, and
+            system holes and drawers of the elevation.
+
+        """
+        result = self.get(spec)
+        if result is None:
+            cabinet_maker = CabinetMaker(**spec)
+            cabinet_maker.make_cabinet(plot=False, write_elevation=False)
+            result = {
+                'material': cabinet_maker.measurements,
+                'holes': cabinet_maker.cabinet.get_system_holes(),
+                'drawers': cabinet_maker.cabinet.get_drawers()
+            }
+            self.put(spec, result)
+
+        return result
+
+    def get_stats(self) -> dict:
+        """Hits, misses, and evictions of all processes, and stored size
+
+        Returns
+        -------
+        dict
+            Counts of hits, misses, evictions, and entries, and bytes of
+            stored results.
+
+        """
+        self._flush_usage()
+        connection = self._connect()
+        stats = dict(connection.execute('SELECT name, value FROM stats'))
+        entries, size = connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()
+
+        return {
+            'hits': stats.get('hits', 0),
+            'misses': stats.get('misses', 0),
+            'evictions': stats.get('evictions', 0),
+            'entries': entries,
+            'bytes': size
+        }
+
+    def clear(self):
+        connection = self._connect()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('DELETE FROM results')
+            connection.execute('DELETE FROM stats')
+        self._usage = {'hits': 0, 'misses': 0, 'last_used': {}}
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._flush_usage()
+            self._connection.close()
+        self._connection = None
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Show statistics of, or clear the result store.'
+    )
+    parser.add_argument(
+        '--store-file',
+        default='.cabinet_results.sqlite',
+        help='Path of the SQLite database.'
+    )
+    parser.add_argument('command', choices=['stats', 'clear'])
+    arguments = parser.parse_args(argv)
+    result_store = ResultStore(store_file=arguments.store_file)
+    if arguments.command == 'stats':
+        print(json.dumps(result_store.get_stats()))
+    else:
+        result_store.clear()
+    result_store.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
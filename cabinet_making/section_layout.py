@@ -0,0 +1,215 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import numpy as np
+from cabinet_making.constructions import SectionBase
+from cabinet_making.parts import PartList
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class SectionLayout:
+    """Cabinets and filler along walls of a house
+
+    Every wall is split into runs by its appliance gaps, and every run
+    is filled with cabinets of allowed widths, leaving the least filler.
+    Among partitions with the same filler, fewer cabinets, and then
+    widths as equal as possible, are preferred. A single table of the
+    fewest cabinets per run width is computed for the longest run, and
+    shared by all runs of all walls.
+
+    Parameters
+    ----------
+    walls : list[dict]
+        Walls with `wall` (name), `length`, and optionally `gaps`, as
+        pairs of start from the left and width, in millimeters.
+    min_width, max_width : int, optional
+        Range of cabinet widths, multiples of 32, by default from 320
+        to 960.
+    widths : list[int], optional
+        Allowed cabinet widths, multiples of 32, instead of the range.
+    max_filler : int, optional
+        Longest filler per run, by default no limit. Runs which can not
+        be filled within the limit are left to filler entirely.
+    cabinet : dict, optional
+        Keyword arguments of `CabinetMaker` shared by all cabinets, by
+        default a floor cabinet with a single door.
+
+    Notes
+    -----
+    Filler is placed at the right end of its run. The plinth of a run
+    is a `SectionBase` under its cabinets and filler.
+
+    """
+
+    pitch = 32
+    default_cabinet = {
+        'cabinet_type': 'floor',
+        'height': 768,
+        'depth': 544,
+        'sections': [768],
+        'doors_per_section': [1]
+    }
+
+    def __init__(self,
+                 walls: list[dict],
+                 min_width: int = 320,
+                 max_width: int = 960,
+                 widths: list[int] = None,
+                 max_filler: int = None,
+                 cabinet: dict = None) -> None:
+        self.walls = walls
+        self.widths = widths if widths else \
+            list(range(min_width, max_width + 1, self.pitch))
+        for width in self.widths:
+            assert width % self.pitch == 0, \
+                f'Width {width} not a multiple of 32.'
+        self.max_filler = max_filler
+        self.cabinet = {**self.default_cabinet, **(cabinet or {})}
+        self._units = sorted({width // self.pitch for width in self.widths})
+        self._fewest = None
+        self._last = None
+        self._layout = None
+
+    def _runs(self, wall: dict) -> list[tuple[int, int]]:
+        start = 0
+        runs = []
+        for gap_start, gap_width in sorted(wall.get('gaps', [])):
+            assert start <= gap_start \
+                and gap_start + gap_width <= wall['length'], \
+                f'Gap at {gap_start} of wall {wall["wall"]} not correct.'
+            runs.append((start, gap_start - start))
+            start = gap_start + gap_width
+        runs.append((start, wall['length'] - start))
+
+        return [(start, length) for start, length in runs if length > 0]
+
+    def _compute_fewest(self, max_length: int):
+        """Fewest cabinets per sum of widths, in units of 32 mm
+
+        Unreachable sums keep a count above any partition. The width
+        last added is kept to reconstruct a partition.
+
+        """
+        size = max_length // self.pitch + 1
+        unreachable = size + 1
+        fewest = np.full(size, unreachable, dtype=np.int64)
+        last = np.zeros(size, dtype=np.int64)
+        fewest[0] = 0
+        for total in range(1, size):
+            for unit in self._units:
+                if unit > total:
+                    break
+                if fewest[total - unit] + 1 < fewest[total]:
+                    fewest[total] = fewest[total - unit] + 1
+                    last[total] = unit
+        self._fewest = fewest
+        self._last = last
+
+    def _even_units(self, total: int, count: int) -> list[int]:
+        quotient, remainder = divmod(total, count)
+        units = [quotient + 1]*remainder + [quotient]*(count - remainder)
+        if set(units) <= set(self._units):
+            return units
+        # Allowed widths are not contiguous, any fewest partition.
+        units = []
+        while total:
+            units.append(int(self._last[total]))
+            total -= self._last[total]
+
+        return sorted(units, reverse=True)
+
+    def _partition(self, length: int) -> tuple[list[int], int]:
+        unreachable = len(self._fewest)
+        lowest = 0 if self.max_filler is None \
+            else max(0, length - self.max_filler)
+        for total in range(length // self.pitch, 0, -1):
+            if total*self.pitch < lowest:
+                break
+            count = self._fewest[total]
+            if count < unreachable:
+                widths = [
+                    unit*self.pitch
+                    for unit in self._even_units(total, int(count))
+                ]
+
+                return widths, length - total*self.pitch
+
+        return [], length
+
+    def _base_material(self, widths: list[int], filler: int) -> np.ndarray:
+        section_base = SectionBase(
+            depth=self.cabinet['depth'],
+            unit_width=min(widths),
+            unit_count=len(widths),
+            compensation=sum(widths) - min(widths)*len(widths) + filler
+        )
+        section_base.compute_base_material()
+
+        return section_base.get_parts()
+
+    def compute_layout(self) -> list[dict]:
+        """Partitions of all walls
+
+        Returns
+        -------
+        list[dict]
+            Per wall, its runs with start, length, cabinet widths, and
+            filler, the specs of its cabinets, ready for `CabinetMaker`,
+            and parts of its plinths.
+
+        """
+        runs = {wall['wall']: self._runs(wall) for wall in self.walls}
+        self._compute_fewest(max(
+            [length for wall_runs in runs.values()
+             for _, length in wall_runs] or [0]
+        ))
+        self._layout = []
+        for wall in self.walls:
+            wall_runs = []
+            cabinets = []
+            base = PartList()
+            for start, length in runs[wall['wall']]:
+                widths, filler = self._partition(length)
+                wall_runs.append({
+                    'start': start,
+                    'length': length,
+                    'widths': widths,
+                    'filler': filler
+                })
+                for width in widths:
+                    cabinets.append({
+                        **self.cabinet,
+                        'cabinet_name': f'{wall["wall"]}_{len(cabinets)}',
+                        'width': width
+                    })
+                if widths:
+                    base.extend(self._base_material(widths, filler))
+            self._layout.append({
+                'wall': wall['wall'],
+                'runs': wall_runs,
+                'cabinets': cabinets,
+                'base': base
+            })
+
+        return self._layout
+
+    def get_cabinet_specs(self) -> list[dict]:
+
+        return [
+            cabinet for wall in self._layout for cabinet in wall['cabinets']
+        ]
+
+    def get_base_material(self, wall: str) -> pd.DataFrame:
+        """Plinths of a wall
+
+        Returns
+        -------
+        pd.DataFrame
+            Table of material of the `SectionBase` of every run.
+
+        """
+        for layout in self._layout:
+            if layout['wall'] == wall:
+                return layout['base'].to_frame()
+        raise KeyError(f'Wall {wall} not in the layout.')
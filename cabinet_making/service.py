@@ -0,0 +1,359 @@
+"""Local HTTP service computing cut lists and elevations
+
+Usage::
+
+    python -m cabinet_making.service --port 8080 --workers 2
+
+Endpoints:
+
+- `POST /cabinet`: keyword arguments of `CabinetMaker` as JSON,
+- `POST /project`: project spec as JSON, see `ProjectSpec`,
+- `GET /health`: status of the service.
+
+Cabinets are computed on a pool of worker processes, started and warmed
+up once, so that a request costs milliseconds instead of the startup of
+an interpreter. Nothing is written to files.
+
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from cabinet_making.cabinet_maker import CabinetMaker
+from cabinet_making.parts import to_json
+from cabinet_making.project_spec import ProjectSpec
+
+
+def _warm_up() -> bool:
+    # Loads pandas and the elevation within the worker.
+    CabinetMaker(
+        cabinet_name='warm_up', height=768, depth=544, width=608,
+        drawer_front=[768], sections=[768], doors_per_section=[0]
+    ).make_cabinet(plot=False, write_elevation=False)
+
+    return True
+
+
+def _compute_cabinet(spec: dict) -> dict:
+    try:
+        cabinet_maker = CabinetMaker(
+            **{'cabinet_name': 'cabinet', **spec}
+        )
+        cabinet_maker.make_cabinet(plot=False, write_elevation=False)
+        elevation = cabinet_maker.cabinet
+        rows = elevation.iter_rows()
+        header = next(rows)[1:]
+
+        return {
+            'cabinet_name': spec.get('cabinet_name'),
+            'status': 'done',
+            'error': None,
+            'cut_list': cabinet_maker.measurements.values.tolist(),
+            'holes': elevation.get_system_holes(),
+            'drawers': elevation.get_drawers(),
+            'elevation': {
+                'columns': [str(column) for column in header],
+                'rows': [row[1:] for row in rows]
+            }
+        }
+    except Exception as error:
+
+        return {
+            'cabinet_name':
+                spec.get('cabinet_name') if isinstance(spec, dict) else None,
+            'status': 'failed',
+            'error': ''.join(traceback.format_exception(error))
+        }
+
+
+def _compute_batch(specs: list[dict]) -> list[dict]:
+    """Cabinets of several requests, sent to a worker at once"""
+
+    return [_compute_cabinet(spec) for spec in specs]
+
+
+class _Batcher:
+    """Cabinets of concurrent requests, collected into batches
+
+    A batch is sent to the pool when it is full, or when no further
+    cabinet arrived within the delay after its first cabinet.
+
+    """
+
+    def __init__(self,
+                 executor: ProcessPoolExecutor,
+                 batch_size: int,
+                 batch_delay: float) -> None:
+        self.executor = executor
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._pending = set()
+
+    def start(self):
+        self._task = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def submit(self, spec: dict) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((spec, future))
+
+        return future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            # Timed out requests are not computed.
+            batch = [(spec, future) for spec, future in batch
+                     if not future.done()]
+            if batch:
+                task = asyncio.create_task(self._run(batch))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+    async def _run(self, batch: list[tuple]):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor,
+                _compute_batch,
+                [spec for spec, _ in batch]
+            )
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class ComputeService:
+    """Asyncio HTTP service on a warm pool of worker processes
+
+    Parameters
+    ----------
+    host : str, optional
+        Address to listen on, by default localhost only.
+    port : int, optional
+        Port to listen on, by default 8080. With 0, any free port, see
+        `get_port`.
+    max_workers : int, optional
+        Number of worker processes, by default number of processors.
+        Every worker is warmed up before the service listens.
+    max_concurrency : int, optional
+        Requests computed at the same time, by default 64. Further
+        requests wait, within their timeout.
+    timeout : float, optional
+        Seconds per request, by default 30, answered with 504 when
+        exceeded.
+    batch_size : int, optional
+        Cabinets sent to a worker at once, by default 16.
+    batch_delay : float, optional
+        Seconds to wait for further cabinets of a batch, by default
+        0.002.
+    mp_context : optional
+        Multiprocessing context of the worker processes.
+
+    """
+
+    max_body = 16*2**20
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 8080,
+                 max_workers: int = None,
+                 max_concurrency: int = 64,
+                 timeout: float = 30,
+                 batch_size: int = 16,
+                 batch_delay: float = .002,
+                 mp_context=None) -> None:
+        self.host = host
+        self.port = port
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.mp_context = mp_context
+        self._workers = max_workers if max_workers else os.cpu_count()
+        self._executor = None
+        self._batcher = None
+        self._server = None
+        self._semaphore = None
+
+    async def start(self):
+        """Start and warm up the workers, then listen"""
+        loop = asyncio.get_running_loop()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=self.mp_context
+        )
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _warm_up)
+            for _ in range(self._workers)
+        ))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._batcher = _Batcher(
+            self._executor, self.batch_size, self.batch_delay
+        )
+        self._batcher.start()
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port
+        )
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        await self._batcher.stop()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def get_port(self) -> int:
+
+        return self._server.sockets[0].getsockname()[1]
+
+    async def _compute_cabinets(self, specs: list[dict]) -> list[dict]:
+        async with self._semaphore:
+            return await asyncio.gather(
+                *(self._batcher.submit(spec) for spec in specs)
+            )
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple:
+        if path == '/health':
+            if method != 'GET':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use GET.'}
+            return HTTPStatus.OK, {'status': 'ok'}
+        if path not in ('/cabinet', '/project'):
+            return HTTPStatus.NOT_FOUND, {'error': f'No endpoint {path}.'}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use POST.'}
+        try:
+            spec = json.loads(body)
+            if not isinstance(spec, dict):
+                return HTTPStatus.BAD_REQUEST, \
+                    {'error': 'Spec is not a JSON object.'}
+            if path == '/cabinet':
+                cabinets, specs = [{}], [spec]
+            else:
+                project_spec = ProjectSpec(spec=spec)
+                cabinets = project_spec.read_spec()
+                specs = project_spec.get_maker_specs()
+        except (ValueError, AssertionError, AttributeError, TypeError) as error:
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+        try:
+            results = await asyncio.wait_for(
+                self._compute_cabinets(specs), self.timeout
+            )
+        except asyncio.TimeoutError:
+            return HTTPStatus.GATEWAY_TIMEOUT, {'error': 'Timed out.'}
+        for cabinet, result in zip(cabinets, results):
+            for key in ProjectSpec.location_keys:
+                if key in cabinet:
+                    result[key] = cabinet[key]
+        if path == '/cabinet':
+            return HTTPStatus.OK, results[0]
+
+        return HTTPStatus.OK, {'cabinets': results}
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple:
+        request_line = await reader.readline()
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0))
+        assert length <= self.max_body, 'Request body too large.'
+        body = await reader.readexactly(length) if length else b''
+
+        return method, path.split('?', 1)[0], body
+
+    async def _handle(self,
+                      reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter):
+        try:
+            try:
+                method, path, body = await self._read_request(reader)
+            except (ValueError, AssertionError,
+                    asyncio.IncompleteReadError) as error:
+                status, response = \
+                    HTTPStatus.BAD_REQUEST, {'error': str(error)}
+            else:
+                try:
+                    status, response = await self._route(method, path, body)
+                except Exception as error:
+                    # Such as a broken pool of workers.
+                    status, response = HTTPStatus.INTERNAL_SERVER_ERROR, \
+                        {'error': f'{type(error).__name__}: {error}'}
+            content = json.dumps(response, default=to_json).encode()
+            writer.write(
+                f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                'Content-Type: application/json\r\n'
+                f'Content-Length: {len(content)}\r\n'
+                'Connection: close\r\n\r\n'.encode('latin-1') + content
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Serve cut lists and elevations over HTTP.'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-concurrency', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=30)
+    arguments = parser.parse_args(argv)
+    service = ComputeService(
+        host=arguments.host,
+        port=arguments.port,
+        max_workers=arguments.workers,
+        max_concurrency=arguments.max_concurrency,
+        timeout=arguments.timeout
+    )
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
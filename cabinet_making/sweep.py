@@ -0,0 +1,191 @@
+import itertools
+import numpy as np
+import pandas as pd
+from cabinet_making.batch import CutListBatch
+
+
+class DesignSweep:
+    """Material totals over a grid of cabinet dimensions
+
+    Every combination of the given heights, widths, depths, drawer
+    stacks and shelf counts is a variant. Cut lists of all variants are
+    computed in a single pass of `CutListBatch`, and totalled per
+    variant and material with NumPy.
+
+    Parameters
+    ----------
+    cabinet_type : str, optional
+        `floor`, `wall` or `cupboard`, by default `floor`.
+    heights, widths, depths : list[int]
+        Dimensions of variants, multiples of 32.
+    drawer_stacks : list[list[int]], optional
+        Drawer fronts of variants, by default no drawers. Floor cabinets
+        with drawers get no doors.
+    shelf_counts : list[int], optional
+        Shelf counts of variants, by default no shelves. Floor cabinets
+        have no shelves.
+
+    Notes
+    -----
+    Variants whose drawer stack does not fit their height are left out:
+    drawers of floor cabinets fill the whole height, drawers of
+    cupboards leave room for the door above them.
+
+    Banding is measured along the edges named by the banding label of a
+    part, `duza` being the longer and `kraca` the shorter dimension.
+
+    """
+
+    counts = {'jedna': 1, 'dve': 2}
+    edges = {'duz': 0, 'krac': 1}
+
+    def __init__(self,
+                 cabinet_type: str = 'floor',
+                 heights: list[int] = None,
+                 widths: list[int] = None,
+                 depths: list[int] = None,
+                 drawer_stacks: list[list[int]] = None,
+                 shelf_counts: list[int] = None) -> None:
+        assert cabinet_type in CutListBatch.back_tolerance, \
+            f'Cabinet type {cabinet_type} not known.'
+        self.cabinet_type = cabinet_type
+        self.heights = heights
+        self.widths = widths
+        self.depths = depths
+        self.drawer_stacks = drawer_stacks if drawer_stacks else [[]]
+        assert cabinet_type != 'floor' or not any(shelf_counts or []), \
+            'Floor cabinets have no shelves.'
+        self.shelf_counts = shelf_counts \
+            if shelf_counts and cabinet_type != 'floor' else [0]
+        self._variants = None
+        self._banding_edges = {}
+
+    def _fits(self, height: int, drawers: tuple) -> bool:
+        if not drawers:
+            return True
+        if self.cabinet_type == 'floor':
+            return sum(drawers) == height
+        if self.cabinet_type == 'cupboard':
+            return sum(drawers) < height
+
+        return False
+
+    def _make_variants(self):
+        grid = itertools.product(
+            self.heights,
+            self.widths,
+            self.depths,
+            [tuple(stack) for stack in self.drawer_stacks],
+            self.shelf_counts
+        )
+        self._variants = pd.DataFrame(
+            [
+                (height, width, depth, drawers, shelves)
+                for height, width, depth, drawers, shelves in grid
+                if self._fits(height, drawers)
+            ],
+            columns=['height', 'width', 'depth', 'drawers', 'shelves']
+        )
+
+    def _make_specs(self) -> pd.DataFrame:
+        variants = self._variants
+        count = len(variants)
+        drawers = [list(stack) for stack in variants['drawers']]
+        if self.cabinet_type == 'floor':
+            doors_per_section = [[0] if stack else [1] for stack in drawers]
+        else:
+            doors_per_section = [[1]]*count
+
+        return pd.DataFrame({
+            'type': self.cabinet_type,
+            'height': variants['height'],
+            'width': variants['width'],
+            'depth': variants['depth'],
+            'drawers': drawers,
+            'sections': [[height] for height in variants['height']],
+            'doors_per_section': doors_per_section,
+            'shelves': [
+                self._shelf_positions(shelves)
+                for shelves in variants['shelves']
+            ]
+        })
+
+    def _shelf_positions(self, shelves: int) -> list[int]:
+        # Only the count of positions affects the material. Cupboards
+        # without dividers get one shelf less than positions.
+        if self.cabinet_type == 'cupboard' and shelves:
+            return [0]*(shelves + 1)
+
+        return [0]*shelves
+
+    def _edges(self, banding: str) -> tuple[int, int]:
+        """Banded long and short edges of a part"""
+        edges = self._banding_edges.get(banding)
+        if edges is None:
+            edges = [0, 0]
+            if banding == 'u krug':
+                edges = [2, 2]
+            elif isinstance(banding, str):
+                for term in banding.replace('_', ' ').split(','):
+                    words = term.split()
+                    if len(words) != 2 or words[0] not in self.counts:
+                        continue
+                    for edge, index in self.edges.items():
+                        if words[1].startswith(edge):
+                            edges[index] += self.counts[words[0]]
+            edges = self._banding_edges[banding] = tuple(edges)
+
+        return edges
+
+    def compute_sweep(self) -> pd.DataFrame:
+        """Material totals of every variant
+
+        Returns
+        -------
+        pd.DataFrame
+            Tidy table with one row per variant and material: height,
+            width, depth, drawers, shelves, material, area in square
+            metres, banding in metres, and count of parts.
+
+        """
+        self._make_variants()
+        if self._variants.empty:
+            return pd.DataFrame(columns=[
+                *self._variants.columns, 'material', 'area', 'banding',
+                'parts'
+            ])
+        material = CutListBatch(self._make_specs()).compute_total_material()
+        variants = material.index.get_level_values(0).to_numpy()
+        codes, names = pd.factorize(material[0])
+        x = material[2].to_numpy(dtype=np.float64)
+        y = material[3].to_numpy(dtype=np.float64)
+        units = material[4].to_numpy(dtype=np.int64)
+        codes_banding, bandings = pd.factorize(
+            material[5], use_na_sentinel=False
+        )
+        edges = np.array(
+            [self._edges(banding) for banding in bandings], dtype=np.int64
+        )[codes_banding]
+        banding = (
+            edges[:, 0]*np.maximum(x, y) + edges[:, 1]*np.minimum(x, y)
+        )*units
+        keys = variants*len(names) + codes
+        size = len(self._variants)*len(names)
+        totals = {
+            'area': np.bincount(keys, weights=x*y*units, minlength=size)/1e6,
+            'banding': np.bincount(keys, weights=banding, minlength=size)/1e3,
+            'parts': np.bincount(keys, weights=units, minlength=size)
+        }
+        present = np.bincount(keys, minlength=size) > 0
+        rows = np.flatnonzero(present)
+        sweep = self._variants.iloc[rows // len(names)].reset_index(drop=True)
+        sweep['material'] = np.asarray(names, dtype=object)[rows % len(names)]
+        sweep['area'] = totals['area'][rows]
+        sweep['banding'] = totals['banding'][rows]
+        sweep['parts'] = totals['parts'][rows].astype(np.int64)
+
+        return sweep
+
+    def get_variants(self) -> pd.DataFrame:
+
+        return self._variants
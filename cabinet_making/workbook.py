@@ -0,0 +1,68 @@
+from typing import Iterable
+from openpyxl import Workbook
+from cabinet_making.cabinet_maker import CabinetMaker
+from cabinet_making.cut_list import CutList
+
+
+class ProjectWorkbook:
+    """Material and elevations of the whole project within a single workbook
+
+    The workbook is written in write-only mode, streaming row after row,
+    so that memory does not depend on the number of cabinets. Every
+    sheet is closed once written, so that open files do not depend on it
+    either. Material
+    of all cabinets is summarized on the first sheet, followed by one
+    elevation sheet per cabinet.
+
+    Parameters
+    ----------
+    workbook_file : str
+        Path of the xlsx file.
+    cabinets : Iterable[CabinetMaker]
+        Cabinets of the project, possibly a generator. Cabinets which
+        are not made yet, are made without writing their own files.
+
+    """
+
+    summary_sheet = 'MATERIJAL'
+    max_sheet_name = 31  # Limit of Excel.
+
+    def __init__(self,
+                 workbook_file: str = None,
+                 cabinets: Iterable[CabinetMaker] = None) -> None:
+        self.workbook_file = workbook_file
+        self.cabinets = cabinets
+        self._cut_list = None
+
+    def _sheet_name(self, cabinet: CabinetMaker, sheet_names: set) -> str:
+        sheet_name = str(cabinet.cabinet_name)[:self.max_sheet_name]
+        assert sheet_name not in sheet_names, \
+            f'Sheet {sheet_name} already in the workbook.'
+        sheet_names.add(sheet_name)
+
+        return sheet_name
+
+    def write_workbook(self):
+        self._cut_list = CutList()
+        workbook = Workbook(write_only=True)
+        sheet_names = {self.summary_sheet}
+        for cabinet in self.cabinets:
+            if cabinet.cabinet is None:
+                cabinet.make_cabinet(plot=False, write_elevation=False)
+            self._cut_list.add(cabinet.measurements)
+            elevation_sheet = workbook.create_sheet(
+                title=self._sheet_name(cabinet, sheet_names)
+            )
+            for row in cabinet.cabinet.iter_rows():
+                elevation_sheet.append(row)
+            # Releases the handle of the temporary file of the sheet.
+            elevation_sheet.close()
+        summary_sheet = workbook.create_sheet(title=self.summary_sheet, index=0)
+        summary_sheet.append(self._cut_list.columns)
+        for row in self._cut_list.iter_rows():
+            summary_sheet.append(row)
+        workbook.save(self.workbook_file)
+
+    def get_cut_list(self) -> CutList:
+
+        return self._cut_list
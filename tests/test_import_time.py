@@ -0,0 +1,23 @@
+import importlib.util
+from pathlib import Path
+import pytest
+
+specification = importlib.util.spec_from_file_location(
+    'import_time',
+    Path(__file__).resolve().parent.parent / 'benchmarks' / 'import_time.py'
+)
+import_time = importlib.util.module_from_spec(specification)
+specification.loader.exec_module(import_time)
+
+
+@pytest.mark.parametrize(
+    'module, budget, allowed',
+    import_time.budgets,
+    ids=[module for module, _, _ in import_time.budgets]
+)
+def test_import_within_budget(module, budget, allowed):
+    seconds, loaded = import_time.measure(module)
+
+    assert [name for name in loaded if name not in allowed] == []
+    assert seconds <= budget, \
+        f'{module} imported in {seconds*1000:.1f} ms, over its budget.'
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from cabinet_making.cabinet_maker import CabinetMaker
+
+# Primitives of the same cabinets as drawn patch by patch, before patches
+# were grouped into collections, with their extents in data coordinates.
+reference_file = Path(__file__).parent / 'data' / 'plot_primitives.json'
+
+cabinets = {
+    'floor': dict(
+        cabinet_type='floor',
+        cabinet_name='floor',
+        height=768,
+        depth=448,
+        width=608,
+        drawer_front=[288, 160, 160, 160],
+        sections=[768],
+        doors_per_section=[0]
+    ),
+    'cupboard': dict(
+        cabinet_type='cupboard',
+        cabinet_name='cupboard',
+        height=2208,
+        depth=544,
+        width=608,
+        drawer_front=[256, 256],
+        sections=[1216, 992],
+        dividers=[],
+        shelves=[1216]
+    )
+}
+
+
+def _draw(spec: dict) -> Figure:
+    cabinet_maker = CabinetMaker(**spec)
+    cabinet_maker.make_cabinet(plot=False, write_elevation=False)
+    plotter = cabinet_maker.get_plotter()
+    plotter.material = None
+    figure = Figure()
+    plotter.draw_cabinet(figure=figure)
+
+    return figure
+
+
+def _rendered(color) -> list[float]:
+    # Unfilled patches keep their color at zero alpha, collections do not.
+    color = np.asarray(color, dtype=float)
+
+    return np.append(color[:3]*color[3], color[3]).tolist()
+
+
+def _collection_primitives(axis) -> list[dict]:
+    primitives = []
+    for collection in axis.collections:
+        paths = collection.get_paths()
+        facecolors = np.broadcast_to(
+            collection.get_facecolor(), (len(paths), 4)
+        )
+        edgecolors = np.broadcast_to(
+            collection.get_edgecolor(), (len(paths), 4)
+        )
+        for index, path in enumerate(paths):
+            primitives.append({
+                'extents': path.get_extents().extents.tolist(),
+                'facecolor': _rendered(facecolors[index]),
+                'edgecolor': _rendered(edgecolors[index]),
+                'hatch': collection.get_hatch(),
+                'zorder': collection.get_zorder()
+            })
+
+    return primitives
+
+
+def _sorted(primitives: list[dict]) -> list[dict]:
+
+    return sorted(primitives, key=lambda primitive: (
+        primitive['zorder'],
+        str(primitive['hatch']),
+        np.round(primitive['extents'], 4).tolist(),
+        np.round(primitive['facecolor'], 4).tolist()
+    ))
+
+
+@pytest.mark.parametrize('cabinet', cabinets)
+def test_collections_match_patches(cabinet):
+    reference = json.loads(reference_file.read_text())[cabinet]
+    primitives = _collection_primitives(_draw(cabinets[cabinet]).axes[0])
+
+    assert len(primitives) == len(reference)
+    for primitive, expected in zip(_sorted(primitives), _sorted(reference)):
+        for key in ('extents', 'facecolor', 'edgecolor'):
+            np.testing.assert_allclose(
+                primitive[key], expected[key], atol=1e-5
+            )
+        assert primitive['hatch'] == expected['hatch']
+        assert primitive['zorder'] == expected['zorder']